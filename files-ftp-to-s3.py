@@ -1,5 +1,5 @@
-from ftplib import FTP_TLS
 import s3fs
+from fsspec.implementations.ftp import FTPFileSystem
 import logging
 
 logger = logging.getLogger()
@@ -13,14 +13,8 @@ def lambda_handler(event, context):
     ftp_path = "/test_folder/" #provide FTP path
     s3Bucket = "s3-bucket"     #provide s3 bucket name
 
-    ftps = FTP_TLS(ftp_url)
-    ftps.login('<user_name>','<pwd>')
-    ftps.prot_p()
+    ftp = FTPFileSystem(ftp_url, username='<user_name>', password='<pwd>', tls=True)
     logger.info('Login Successful')
-    ftps.cwd(ftp_path)
-    
-    logger.info('Files in FTP '+str(ftps.nlst()))
-    for file_name in ftps.nlst():
-        logger.info('Downloading file: ' +file_name)
-        ftps.retrbinary('RETR ' + file_name, s3.open("{}/{}".format(s3Bucket, file_name), 'wb').write)
-        logger.info('Download completed: ' +file_name)
+
+    copied = ftp.copy_to(s3, ftp_path + '*', s3Bucket)
+    logger.info('Download completed: ' + str(copied))
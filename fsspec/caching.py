@@ -1,8 +1,11 @@
+import collections
 import os
 import io
-import functools
+import itertools
 import logging
 import math
+import threading
+import weakref
 
 logger = logging.getLogger("fsspec")
 
@@ -21,8 +24,18 @@ class BaseCache(object):
         specified
     size: int
         How big this file is
+
+    Attributes
+    ----------
+    fetcher_into: func or None
+        Function of the form f(start, out) which fills the writable memoryview
+        ``out`` with the bytes from ``start`` and returns how many it wrote,
+        such as ``AbstractBufferedFile._fetch_range_into``. Used, if set, to
+        avoid intermediate copies.
     """
 
+    fetcher_into = None
+
     def __init__(self, blocksize, fetcher, size):
         self.blocksize = blocksize
         self.fetcher = fetcher
@@ -31,6 +44,27 @@ class BaseCache(object):
     def _fetch(self, start, end):
         return self.fetcher(start, end)
 
+    def _fetch_into(self, start, out):
+        """Fill ``out`` from the remote, with ``fetcher_into`` if available"""
+        if self.fetcher_into is not None:
+            return self.fetcher_into(start, out)
+        data = self.fetcher(start, start + len(out))
+        out[: len(data)] = data
+        return len(data)
+
+    def _readinto(self, start, out):
+        """Copy the bytes from ``start`` into the buffer ``out``
+
+        ``out`` is a writable memoryview of format "B". Returns the number of
+        bytes copied, which is smaller than ``len(out)`` at the end of the file.
+        """
+        if type(self)._fetch is BaseCache._fetch:
+            # nothing is cached: straight from the remote
+            return self._fetch_into(start, out)
+        data = self._fetch(start, start + len(out))
+        out[: len(data)] = data
+        return len(data)
+
     def __getitem__(self, item: slice):
         if not isinstance(item, slice):
             raise TypeError(
@@ -58,19 +92,157 @@ class BaseCache(object):
         return self._fetch(item.start, item.stop)
 
 
+class BlockBitmap(object):
+    """Set of block numbers, stored as one bit per block
+
+    Used to record which blocks of a file are present in ``MMapCache`` and in
+    the metadata of ``CachingFileSystem``; a 100GB file in 5MB blocks needs
+    2.5kB rather than a set of 20k ints. Pickles as a list of runs of
+    present blocks, so that a fully- or contiguously-read file costs only a
+    few numbers to save.
+    """
+
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self, blocks=()):
+        self._bits = bytearray()
+        self._count = 0
+        self.update(blocks)
+
+    @classmethod
+    def from_runs(cls, runs):
+        """Build from ``(start, length)`` pairs, as produced by ``runs()``"""
+        out = cls()
+        for start, length in runs:
+            out.add_range(start, start + length)
+        return out
+
+    def _grow(self, nbytes):
+        if nbytes > len(self._bits):
+            self._bits.extend(bytes(nbytes - len(self._bits)))
+
+    def add(self, i):
+        byte, bit = divmod(i, 8)
+        self._grow(byte + 1)
+        mask = 1 << bit
+        if not self._bits[byte] & mask:
+            self._bits[byte] |= mask
+            self._count += 1
+
+    def add_range(self, start, stop):
+        """Add blocks ``start`` to ``stop - 1``"""
+        while start < stop and start % 8:
+            self.add(start)
+            start += 1
+        full = (stop - start) // 8
+        if full:
+            first = start // 8
+            self._grow(first + full)
+            self._count += 8 * full - _popcount(self._bits[first : first + full])
+            self._bits[first : first + full] = b"\xff" * full
+            start += 8 * full
+        while start < stop:
+            self.add(start)
+            start += 1
+
+    def update(self, blocks):
+        if isinstance(blocks, BlockBitmap):
+            self._grow(len(blocks._bits))
+            for byte, value in enumerate(blocks._bits):
+                if value:
+                    self._bits[byte] |= value
+            self._count = _popcount(self._bits)
+        else:
+            for i in blocks:
+                self.add(i)
+
+    def __or__(self, other):
+        out = BlockBitmap(self)
+        out.update(other)
+        return out
+
+    def __contains__(self, i):
+        byte, bit = divmod(i, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << bit))
+
+    def __iter__(self):
+        for byte, value in enumerate(self._bits):
+            if value:
+                for bit in range(8):
+                    if value & (1 << bit):
+                        yield byte * 8 + bit
+
+    def __len__(self):
+        return self._count
+
+    def __eq__(self, other):
+        if isinstance(other, BlockBitmap):
+            return self._bits.rstrip(b"\x00") == other._bits.rstrip(b"\x00")
+        if isinstance(other, (set, frozenset)):
+            return set(self) == other
+        return NotImplemented
+
+    def isfull(self, nblocks):
+        """Whether all of blocks ``0`` to ``nblocks - 1`` are present"""
+        if self._count < nblocks:
+            return False
+        full, rest = divmod(nblocks, 8)
+        if self._bits[:full] != b"\xff" * full:
+            return False
+        mask = (1 << rest) - 1
+        return not rest or self._bits[full] & mask == mask
+
+    def runs(self):
+        """Present blocks as a list of ``(start, length)`` pairs"""
+        out = []
+        start = None
+        for byte, value in enumerate(self._bits):
+            if value in (0, 255) and (start is None) == (value == 0):
+                # whole byte continues the current state
+                continue
+            for bit in range(8):
+                i = byte * 8 + bit
+                if value & (1 << bit):
+                    if start is None:
+                        start = i
+                elif start is not None:
+                    out.append((start, i - start))
+                    start = None
+        if start is not None:
+            out.append((start, len(self._bits) * 8 - start))
+        return out
+
+    def __reduce__(self):
+        return BlockBitmap.from_runs, (self.runs(),)
+
+    def __repr__(self):
+        return "<BlockBitmap, %i blocks in %i runs>" % (len(self), len(self.runs()))
+
+
+def _popcount(data):
+    return bin(int.from_bytes(bytes(data), "little")).count("1")
+
+
 class MMapCache(BaseCache):
     """memory-mapped sparse file cache
 
     Opens temporary file, which is filled blocks-wise when data is requested.
     Ensure there is enough disc space in the temporary location.
 
+    Missing blocks which are contiguous are fetched with a single request;
+    with ``max_workers > 1``, separate runs of missing blocks are fetched
+    concurrently, so the fetcher must then be thread-safe.
+
     This cache method might only work on posix
     """
 
-    def __init__(self, blocksize, fetcher, size, location=None, blocks=None):
+    def __init__(
+        self, blocksize, fetcher, size, location=None, blocks=None, max_workers=1
+    ):
         super().__init__(blocksize, fetcher, size)
-        self.blocks = set() if blocks is None else blocks
+        self.blocks = BlockBitmap() if blocks is None else blocks
         self.location = location
+        self.max_workers = max_workers
         self.cache = self._makefile()
 
     def _makefile(self):
@@ -84,7 +256,7 @@ class MMapCache(BaseCache):
         if self.location is None or not os.path.exists(self.location):
             if self.location is None:
                 fd = tempfile.TemporaryFile()
-                self.blocks = set()
+                self.blocks = BlockBitmap()
             else:
                 fd = io.open(self.location, "wb+")
             fd.seek(self.size - 1)
@@ -96,17 +268,37 @@ class MMapCache(BaseCache):
         return mmap.mmap(fd.fileno(), self.size)
 
     def _fetch(self, start, end):
+        end = min(end, self.size)
+        if start >= end:
+            return b""
         start_block = start // self.blocksize
-        end_block = end // self.blocksize
+        end_block = (end - 1) // self.blocksize
         need = [i for i in range(start_block, end_block + 1) if i not in self.blocks]
-        while need:
-            # TODO: not a for loop so we can consolidate blocks later to
-            # make fewer fetch calls; this could be parallel
-            i = need.pop(0)
-            sstart = i * self.blocksize
-            send = min(sstart + self.blocksize, self.size)
-            self.cache[sstart:send] = self.fetcher(sstart, send)
-            self.blocks.add(i)
+        runs = _block_runs(need)
+        with memoryview(self.cache) as view:
+
+            def fill(run):
+                first, last = run
+                sstart = first * self.blocksize
+                send = min((last + 1) * self.blocksize, self.size)
+                n = self._fetch_into(sstart, view[sstart:send])
+                if n != send - sstart:
+                    raise IOError(
+                        "Expected %i bytes at %i, got %i" % (send - sstart, sstart, n)
+                    )
+
+            if len(runs) > 1 and self.max_workers > 1:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(
+                    max_workers=min(self.max_workers, len(runs))
+                ) as ex:
+                    list(ex.map(fill, runs))
+            else:
+                for run in runs:
+                    fill(run)
+        for first, last in runs:
+            self.blocks.add_range(first, last + 1)
 
         return self.cache[start:end]
 
@@ -122,12 +314,27 @@ class MMapCache(BaseCache):
         self.cache = self._makefile()
 
 
+def _block_runs(blocks):
+    """Group sorted block numbers into (first, last) runs of consecutive ones"""
+    runs = []
+    for i in blocks:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return [tuple(run) for run in runs]
+
+
 class ReadAheadCache(BaseCache):
     """ Cache which reads only when we get beyond a block of data
 
     This is a much simpler version of BytesCache, and does not attempt to
     fill holes in the cache or keep fragments alive. It is best suited to
     many small reads in a sequential order (e.g., reading lines from a file).
+
+    The fetched block is kept as returned by the fetcher, and reads are
+    served from memoryviews of it, so that each byte is copied only once on
+    its way to the caller.
     """
 
     def __init__(self, blocksize, fetcher, size):
@@ -137,41 +344,131 @@ class ReadAheadCache(BaseCache):
         self.end = 0
 
     def _fetch(self, start, end):
+        return b"".join(self._parts(start, end))
+
+    def _readinto(self, start, out):
+        n = 0
+        for part in self._parts(start, start + len(out)):
+            out[n : n + len(part)] = part
+            n += len(part)
+        return n
+
+    def _parts(self, start, end):
+        """Views of the cached data making up ``start`` to ``end``"""
         end = min(self.size, end)
         l = end - start
         if start >= self.size:
-            return b""
+            return []
         elif start >= self.start and end <= self.end:
             # cache hit
-            return self.cache[start - self.start : end - self.start]
+            return [memoryview(self.cache)[start - self.start : end - self.start]]
         elif self.start <= start < self.end:
             # partial hit
-            part = self.cache[start - self.start :]
+            part = memoryview(self.cache)[start - self.start :]
             l -= len(part)
             start = self.end
         else:
             # miss
-            part = b""
+            part = memoryview(b"")
         end = min(self.size, end + self.blocksize)
         self.cache = self.fetcher(start, end)  # new block replaces old
         self.start = start
         self.end = self.start + len(self.cache)
-        return part + self.cache[:l]
+        return [part, memoryview(self.cache)[:l]]
+
+
+class BlockPool(object):
+    """Memory for the blocks of ``BlockCache`` instances, limited in bytes
+
+    Blocks are evicted least-recently-used first, whichever file they belong
+    to, once their total size exceeds ``max_bytes``. Pass one instance to
+    several caches, e.g., ``cache_options={"pool": pool}`` in ``open()``, to
+    keep many open files within a single memory budget. Thread-safe.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Total size of the blocks to keep
+    """
+
+    def __init__(self, max_bytes=2 ** 28):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._blocks = collections.OrderedDict()  # (owner, number) -> bytes
+        self._counts = collections.Counter()  # owner -> number of blocks
+        self._owners = itertools.count()
+        self._lock = threading.Lock()
+
+    def new_owner(self):
+        """A key under which a cache can store its blocks"""
+        return next(self._owners)
+
+    def get(self, owner, number):
+        """The block, or None if it is not held"""
+        key = owner, number
+        with self._lock:
+            data = self._blocks.get(key)
+            if data is not None:
+                self._blocks.move_to_end(key)
+            return data
+
+    def put(self, owner, number, data):
+        key = owner, number
+        with self._lock:
+            if key in self._blocks:
+                self.nbytes -= len(self._blocks.pop(key))
+                self._counts[owner] -= 1
+            self._blocks[key] = data
+            self.nbytes += len(data)
+            self._counts[owner] += 1
+            while self.nbytes > self.max_bytes and len(self._blocks) > 1:
+                (old, _), evicted = self._blocks.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self._counts[old] -= 1
+
+    def discard(self, owner):
+        """Drop all blocks of ``owner``"""
+        with self._lock:
+            for key in [k for k in self._blocks if k[0] == owner]:
+                self.nbytes -= len(self._blocks.pop(key))
+            self._counts.pop(owner, None)
+
+    def count(self, owner):
+        """Number of blocks held for ``owner``"""
+        return self._counts[owner]
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def __repr__(self):
+        return "<BlockPool, %i blocks, %i of %i bytes>" % (
+            len(self),
+            self.nbytes,
+            self.max_bytes,
+        )
+
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
 
 
 class BlockCache(BaseCache):
     """
     Cache holding memory as a set of blocks.
 
-    Requests are only ever made `blocksize` at a time, and are
-    stored in an LRU cache. The least recently accessed block is
-    discarded when more than `maxblocks` are stored.
+    Requests are only ever made for whole blocks, and the blocks are
+    stored in an LRU cache. A read spanning several blocks which are not
+    yet cached fetches each run of consecutive missing blocks with a
+    single request. The least recently accessed block is
+    discarded when more than `maxblocks` are stored, or, if a shared
+    ``BlockPool`` is given, when the pool is over its byte budget.
 
     Parameters
     ----------
     blocksize : int
         The number of bytes to store in each block.
-        Requests are only ever made for `blocksize`, so this
+        Requests are made for multiples of `blocksize`, so this
         should balance the overhead of making a request against
         the granularity of the blocks.
     fetcher : Callable
@@ -179,14 +476,28 @@ class BlockCache(BaseCache):
         The total size of the file being cached.
     maxblocks : int
         The maximum number of blocks to cache for. The maximum memory
-        use for this cache is then ``blocksize * maxblocks``.
+        use for this cache is then ``blocksize * maxblocks``. Ignored if
+        ``pool`` is given.
+    pool : BlockPool or None
+        Where to keep blocks, possibly shared with other caches. If None,
+        a private pool of ``blocksize * maxblocks`` bytes is used.
     """
 
-    def __init__(self, blocksize, fetcher, size, maxblocks=32):
+    def __init__(self, blocksize, fetcher, size, maxblocks=32, pool=None):
         super().__init__(blocksize, fetcher, size)
         self.nblocks = math.ceil(size / blocksize)
         self.maxblocks = maxblocks
-        self._fetch_block_cached = functools.lru_cache(maxblocks)(self._fetch_block)
+        self._attach(pool)
+
+    def _attach(self, pool):
+        self.shared = pool is not None
+        if pool is None:
+            pool = BlockPool(self.blocksize * self.maxblocks)
+        self.pool = pool
+        self._owner = pool.new_owner()
+        self.hits = self.misses = 0
+        # release this file's blocks from a shared pool when done with
+        weakref.finalize(self, pool.discard, self._owner)
 
     def __repr__(self):
         return "<BlockCache blocksize={}, size={}, nblocks={}>".format(
@@ -200,20 +511,23 @@ class BlockCache(BaseCache):
         Returns
         ----------
         NamedTuple
-            Returned directly from the LRU Cache used internally.
+            Hits and misses of block lookups, ``maxblocks`` and the number of
+            this file's blocks currently held.
         """
-        return self._fetch_block_cached.cache_info()
+        return CacheInfo(
+            self.hits, self.misses, self.maxblocks, self.pool.count(self._owner)
+        )
 
     def __getstate__(self):
-        state = self.__dict__
-        del state["_fetch_block_cached"]
+        state = self.__dict__.copy()
+        for key in ["pool", "_owner", "shared", "hits", "misses"]:
+            del state[key]
         return state
 
     def __setstate__(self, state):
+        # blocks are not pickled, and a shared pool is not kept
         self.__dict__.update(state)
-        self._fetch_block_cached = functools.lru_cache(state["maxblocks"])(
-            self._fetch_block
-        )
+        self._attach(None)
 
     def _fetch(self, start, end):
         if end < start:
@@ -223,79 +537,78 @@ class BlockCache(BaseCache):
 
         if end > self.size:
             raise ValueError("'end={}' larger than size ('{}')".format(end, self.size))
+        if start == end:
+            return b""
 
         # byte position -> block numbers
         start_block_number = start // self.blocksize
-        end_block_number = end // self.blocksize
+        end_block_number = (end - 1) // self.blocksize
+        offset = start_block_number * self.blocksize
 
-        # these are cached, so safe to do multiple calls for the same start and end.
+        blocks = {}
         for block_number in range(start_block_number, end_block_number + 1):
-            self._fetch_block(block_number)
-
-        return self._read_cache(
-            start,
-            end,
-            start_block_number=start_block_number,
-            end_block_number=end_block_number,
+            block = self.pool.get(self._owner, block_number)
+            if block is not None:
+                self.hits += 1
+                blocks[block_number] = block
+        missing = [
+            block_number
+            for block_number in range(start_block_number, end_block_number + 1)
+            if block_number not in blocks
+        ]
+        # consecutive missing blocks are fetched with a single request
+        for first, last in _block_runs(missing):
+            for block_number, block in zip(
+                range(first, last + 1), self._fetch_blocks(first, last)
+            ):
+                self.misses += 1
+                self.pool.put(self._owner, block_number, block)
+                blocks[block_number] = block
+
+        if len(blocks) == 1:
+            return blocks[start_block_number][start - offset : end - offset]
+        out = b"".join(
+            blocks[block_number]
+            for block_number in range(start_block_number, end_block_number + 1)
         )
+        return out[start - offset : end - offset]
 
     def _fetch_block(self, block_number):
         """
         Fetch the block of data for `block_number`.
         """
-        if block_number > self.nblocks:
-            raise ValueError(
-                "'block_number={}' is greater than the number of blocks ({})".format(
-                    block_number, self.nblocks
-                )
-            )
-
-        start = block_number * self.blocksize
-        end = start + self.blocksize
-        logger.info("BlockCache fetching block %d", block_number)
-        block_contents = super()._fetch(start, end)
-        return block_contents
+        return self._fetch_blocks(block_number, block_number)[0]
 
-    def _read_cache(self, start, end, start_block_number, end_block_number):
+    def _fetch_blocks(self, first, last):
         """
-        Read from our block cache.
+        Fetch blocks `first` to `last`, inclusive, in one request.
 
-        Parameters
-        ----------
-        start, end : int
-            The start and end byte positions.
-        start_block_number, end_block_number : int
-            The start and end block numbers.
+        Returns a list of the blocks' contents.
         """
-        start_pos = start % self.blocksize
-        end_pos = end % self.blocksize
-
-        if start_block_number == end_block_number:
-            block = self._fetch_block_cached(start_block_number)
-            return block[start_pos:end_pos]
-
-        else:
-            # read from the initial
-            out = []
-            out.append(self._fetch_block_cached(start_block_number)[start_pos:])
-
-            # intermediate blocks
-            # Note: it'd be nice to combine these into one big request. However
-            # that doesn't play nicely with our LRU cache.
-            for block_number in range(start_block_number + 1, end_block_number):
-                out.append(self._fetch_block_cached(block_number))
-
-            # final block
-            out.append(self._fetch_block_cached(end_block_number)[:end_pos])
+        if last > self.nblocks:
+            raise ValueError(
+                "'block_number={}' is greater than the number of blocks ({})".format(
+                    last, self.nblocks
+                )
+            )
 
-            return b"".join(out)
+        start = first * self.blocksize
+        end = min((last + 1) * self.blocksize, self.size)
+        logger.info("BlockCache fetching blocks %d-%d", first, last)
+        data = super()._fetch(start, end)
+        if first == last:
+            return [data]
+        return [
+            data[i : i + self.blocksize] for i in range(0, end - start, self.blocksize)
+        ]
 
 
 class BytesCache(BaseCache):
-    """Cache which holds data in a in-memory bytes object
+    """Cache which holds data in a in-memory bytearray
 
     Implements read-ahead by the block size, for semi-random reads progressing
-    through the file.
+    through the file. The buffer is extended and trimmed in place, so the
+    cost of a long sequential read grows linearly with the amount read.
 
     Parameters
     ----------
@@ -306,12 +619,31 @@ class BytesCache(BaseCache):
 
     def __init__(self, blocksize, fetcher, size, trim=True):
         super().__init__(blocksize, fetcher, size)
-        self.cache = b""
+        self.cache = bytearray()
         self.start = None
         self.end = None
         self.trim = trim
 
     def _fetch(self, start, end):
+        offset, n = self._fill(start, end)
+        with memoryview(self.cache) as view:
+            out = bytes(view[offset : offset + n])
+        self._trim()
+        return out
+
+    def _readinto(self, start, out):
+        offset, n = self._fill(start, start + len(out))
+        with memoryview(self.cache) as view:
+            out[:n] = view[offset : offset + n]
+        self._trim()
+        return n
+
+    def _fill(self, start, end):
+        """Make sure the buffer holds ``start`` to ``end``, as far as possible
+
+        Returns the offset of ``start`` in the buffer and the number of bytes
+        available from there.
+        """
         # TODO: only set start/end after fetch, in case it fails?
         # is this where retry logic might go?
         if (
@@ -321,8 +653,7 @@ class BytesCache(BaseCache):
             and end < self.end
         ):
             # cache hit: we have all the required data
-            offset = start - self.start
-            return self.cache[offset : offset + end - start]
+            return start - self.start, end - start
 
         if self.blocksize:
             bend = min(self.size, end + self.blocksize)
@@ -330,46 +661,235 @@ class BytesCache(BaseCache):
             bend = end
 
         if bend == start or start > self.size:
-            return b""
+            return 0, 0
 
         if (self.start is None or start < self.start) and (
             self.end is None or end > self.end
         ):
             # First read, or extending both before and after
-            self.cache = self.fetcher(start, bend)
+            self.cache = bytearray(self.fetcher(start, bend))
             self.start = start
         elif start < self.start:
             if self.end - end > self.blocksize:
-                self.cache = self.fetcher(start, bend)
+                self.cache = bytearray(self.fetcher(start, bend))
                 self.start = start
             else:
                 new = self.fetcher(start, self.start)
                 self.start = start
-                self.cache = new + self.cache
+                self.cache[:0] = new
         elif bend > self.end:
             if self.end > self.size:
                 pass
             elif end - self.end > self.blocksize:
-                self.cache = self.fetcher(start, bend)
+                self.cache = bytearray(self.fetcher(start, bend))
                 self.start = start
             else:
-                new = self.fetcher(self.end, bend)
-                self.cache = self.cache + new
+                self.cache += self.fetcher(self.end, bend)
 
         self.end = self.start + len(self.cache)
         offset = start - self.start
-        out = self.cache[offset : offset + end - start]
-        if self.trim:
+        return offset, max(0, min(end - start, len(self.cache) - offset))
+
+    def _trim(self):
+        if self.trim and self.start is not None:
             num = (self.end - self.start) // (self.blocksize + 1)
             if num > 1:
+                # deleting from the front of a bytearray does not move the rest
                 self.start += self.blocksize * num
-                self.cache = self.cache[self.blocksize * num :]
-        return out
+                del self.cache[: self.blocksize * num]
 
     def __len__(self):
         return len(self.cache)
 
 
+class AdaptiveCache(BaseCache):
+    """Cache which picks its strategy from the pattern of reads
+
+    Each read is classified as it arrives:
+
+    - a read of the whole file, or of at least ``max_window`` bytes, goes
+      straight to the fetcher without caching ("none");
+    - a read continuing where the previous one ended is served with
+      read-ahead, whose window starts at ``blocksize`` and doubles with each
+      further sequential read, up to ``max_window`` ("readahead");
+    - any other read is taken as random access and served by an LRU of
+      blocks, as with ``BlockCache`` ("block").
+
+    So, e.g., probing the directory of a ZIP file uses a few small blocks,
+    and then extracting members streams with large requests. The choices
+    made are counted in ``stats``.
+
+    Parameters
+    ----------
+    blocksize : int
+        Size of the blocks for random access, and initial read-ahead
+    fetcher : Callable
+    size : int
+    maxblocks : int
+        Number of blocks held for random access
+    max_window : int or None
+        Largest read-ahead, default ``8 * blocksize``
+    """
+
+    def __init__(self, blocksize, fetcher, size, maxblocks=32, max_window=None):
+        super().__init__(blocksize, fetcher, size)
+        self.max_window = max_window or 8 * blocksize
+        self.mode = None
+        self.streak = 0
+        self.last_end = None
+        self.stats = {
+            "none": 0,
+            "readahead": 0,
+            "block": 0,
+            "requests": 0,
+            "fetched_bytes": 0,
+        }
+        self.readahead = ReadAheadCache(blocksize, self._counted_fetch, size)
+        self.blocks = BlockCache(blocksize, self._counted_fetch, size, maxblocks)
+
+    def __repr__(self):
+        return "<AdaptiveCache blocksize={}, size={}, mode={}>".format(
+            self.blocksize, self.size, self.mode
+        )
+
+    def _counted_fetch(self, start, end):
+        out = self.fetcher(start, end)
+        self.stats["requests"] += 1
+        self.stats["fetched_bytes"] += len(out)
+        return out
+
+    def _choose(self, start, end):
+        """Classify the read ``start`` to ``end`` and record the choice"""
+        sequential = start == self.last_end
+        self.last_end = end
+        if (start == 0 and end >= self.size) or end - start >= self.max_window:
+            mode = "none"
+        elif sequential:
+            self.streak += 1
+            mode = "readahead"
+            self.readahead.blocksize = min(
+                self.blocksize * 2 ** (self.streak - 1), self.max_window
+            )
+        else:
+            self.streak = 0
+            mode = "block"
+        self.mode = mode
+        self.stats[mode] += 1
+        return mode
+
+    def _fetch(self, start, end):
+        end = min(end, self.size)
+        if start >= end:
+            return b""
+        mode = self._choose(start, end)
+        if mode == "none":
+            return self._counted_fetch(start, end)
+        return self._cache_for(mode)._fetch(start, end)
+
+    def _readinto(self, start, out):
+        end = min(start + len(out), self.size)
+        if start >= end:
+            return 0
+        mode = self._choose(start, end)
+        if mode == "none":
+            n = self._fetch_into(start, out[: end - start])
+            self.stats["requests"] += 1
+            self.stats["fetched_bytes"] += n
+            return n
+        return self._cache_for(mode)._readinto(start, out[: end - start])
+
+    def _cache_for(self, mode):
+        return self.readahead if mode == "readahead" else self.blocks
+
+
+class PinnedCache(BaseCache):
+    """Cache keeping the start and end of the file for as long as it is open
+
+    Archive and columnar formats, such as ZIP and parquet, keep their index
+    at the end (or start) of the file, and go back to it between reads of
+    the data. Here, the first ``header`` and last ``footer`` bytes are
+    fetched once, the first time a read touches them, and never evicted;
+    all other reads go through another cache, which they can no longer
+    disturb.
+
+    Parameters
+    ----------
+    blocksize : int
+    fetcher : Callable
+    size : int
+    header, footer : int
+        Number of bytes to pin at each end of the file
+    cache_type : str
+        Name of the cache for the rest of the file, see ``caches``
+    cache_options : dict or None
+        Passed to that cache
+    inner : BaseCache or None
+        An existing cache for the rest of the file, used in place of
+        creating one from ``cache_type``
+    """
+
+    def __init__(
+        self,
+        blocksize,
+        fetcher,
+        size,
+        header=2 ** 16,
+        footer=2 ** 16,
+        cache_type="readahead",
+        cache_options=None,
+        inner=None,
+    ):
+        if inner is None:
+            inner = caches[cache_type](
+                blocksize, fetcher, size, **(cache_options or {})
+            )
+        self.inner = inner
+        super().__init__(blocksize, fetcher, size)
+        self.header_end = min(header, size)
+        self.footer_start = max(size - footer, self.header_end)
+        self.header = None
+        self.footer = None
+        self.pinned_hits = 0
+
+    @property
+    def fetcher_into(self):
+        return self.inner.fetcher_into
+
+    @fetcher_into.setter
+    def fetcher_into(self, fetcher_into):
+        self.inner.fetcher_into = fetcher_into
+
+    def __repr__(self):
+        return "<PinnedCache header={}, footer={}, around {!r}>".format(
+            self.header_end, self.size - self.footer_start, self.inner
+        )
+
+    def _fetch(self, start, end):
+        end = min(end, self.size)
+        if start >= end:
+            return b""
+        parts = []
+        if start < self.header_end:
+            if self.header is None:
+                self.header = self.fetcher(0, self.header_end)
+            else:
+                self.pinned_hits += 1
+            parts.append(self.header[start : min(end, self.header_end)])
+            start = min(end, self.header_end)
+        if start < min(end, self.footer_start):
+            parts.append(self.inner._fetch(start, min(end, self.footer_start)))
+            start = min(end, self.footer_start)
+        if start < end:
+            if self.footer is None:
+                self.footer = self.fetcher(self.footer_start, self.size)
+            else:
+                self.pinned_hits += 1
+            parts.append(
+                self.footer[start - self.footer_start : end - self.footer_start]
+            )
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+
 class AllBytes(object):
     """Cache entire contents of the file"""
 
@@ -379,6 +899,12 @@ class AllBytes(object):
     def _fetch(self, start, end):
         return self.data[start:end]
 
+    def _readinto(self, start, out):
+        with memoryview(self.data) as view:
+            part = view[start : start + len(out)]
+            out[: len(part)] = part
+        return len(part)
+
 
 caches = {
     "none": BaseCache,
@@ -386,4 +912,6 @@ caches = {
     "bytes": BytesCache,
     "readahead": ReadAheadCache,
     "block": BlockCache,
+    "adaptive": AdaptiveCache,
+    "pinned": PinnedCache,
 }
@@ -20,6 +20,8 @@ from .caching import (  # noqa: F401
     ReadAheadCache,
     BytesCache,
     BlockCache,
+    AdaptiveCache,
+    PinnedCache,
     caches,
 )
 
@@ -1,13 +1,17 @@
 import time
+import math
 import pickle
 import logging
 import os
 import hashlib
+import sqlite3
 import tempfile
 import inspect
+from contextlib import closing, contextmanager
 from fsspec import AbstractFileSystem, filesystem
 from fsspec.spec import AbstractBufferedFile
 from fsspec.core import MMapCache, BaseCache
+from fsspec.caching import BlockBitmap
 from fsspec.utils import infer_compression
 from fsspec.compression import compr
 
@@ -46,6 +50,9 @@ class CachingFileSystem(AbstractFileSystem):
         fs=None,
         same_names=False,
         compression=None,
+        max_size=None,
+        max_workers=1,
+        write_through=False,
         **kwargs
     ):
         """
@@ -82,6 +89,23 @@ class CachingFileSystem(AbstractFileSystem):
             To decompress on download. Can be 'infer' (guess from the URL name),
             one of the entries in ``fsspec.compression.compr``, or None for no
             decompression.
+        max_size: int (optional)
+            Most bytes of local disc to use for cached files in the writable
+            storage. When a new file would go over, the least recently used
+            cached files and their metadata are deleted. Files in use by this
+            instance are kept. None for no limit.
+        max_workers: int (optional)
+            When copying a whole file into the cache, as filecache and
+            simplecache do, fetch this many byte ranges of it concurrently,
+            writing them in place into the local file. Only applies to
+            uncompressed files from fsspec backends, whose reads must be
+            thread-safe, and on systems with ``os.pwrite``.
+        write_through: bool (optional)
+            Whether files opened for writing ("wb") also write their data to
+            a local copy, which becomes a complete cached copy once the
+            upload is committed, so that reading the file back does not
+            download it. Only applies to files of fsspec backends, and not
+            with ``compression``.
         """
         super().__init__(**kwargs)
         if not (fs is None) ^ (target_protocol is None):
@@ -104,6 +128,10 @@ class CachingFileSystem(AbstractFileSystem):
         self.expiry = expiry_time
         self.compression = compression
         self.same_names = same_names
+        self.max_size = max_size
+        self.max_workers = max_workers
+        self.write_through = write_through
+        self._in_use = set()
         self.target_protocol = (
             target_protocol
             if isinstance(target_protocol, str)
@@ -115,58 +143,83 @@ class CachingFileSystem(AbstractFileSystem):
     def load_cache(self):
         """Read set of stored blocks from file"""
         cached_files = []
+        versions = []
         for storage in self.storage:
             fn = os.path.join(storage, "cache")
             if os.path.exists(fn):
-                with open(fn, "rb") as f:
-                    # TODO: consolidate blocks here
-                    cached_files.append(pickle.load(f))
+                cached, version = _read_metadata(fn)
+                cached_files.append(cached)
+                versions.append(version)
             else:
                 os.makedirs(storage, exist_ok=True)
                 cached_files.append({})
+                versions.append(None)
         self.cached_files = cached_files or [{}]
+        self.cache_versions = versions
         self.last_cache = time.time()
 
-    def save_cache(self):
-        """Save set of stored blocks from file"""
+    def save_cache(self, paths=None):
+        """Save set of stored blocks to file
+
+        The metadata is an sqlite database, so that several processes can
+        share a cache directory: each entry is merged with the one stored,
+        perhaps by another process, within a single locked transaction. A
+        file in the pickle format of older versions is converted first.
+
+        Parameters
+        ----------
+        paths: list of str or None
+            Entries to write; all if None
+        """
         fn = os.path.join(self.storage[-1], "cache")
-        # TODO: a file lock could be used to ensure file does not change
-        #  between re-read and write; but occasional duplicated reads ok.
+        _migrate_metadata(fn)
         cache = self.cached_files[-1]
-        if os.path.exists(fn):
-            with open(fn, "rb") as f:
-                cached_files = pickle.load(f)
-            for k, c in cached_files.items():
-                if c["blocks"] is not True:
-                    if cache[k]["blocks"] is True:
-                        c["blocks"] = True
-                    else:
-                        c["blocks"] = set(c["blocks"]).union(cache[k]["blocks"])
-
-            # Files can be added to cache after it was written once
-            for k, c in cache.items():
-                if k not in cached_files:
-                    cached_files[k] = c
-        else:
-            cached_files = cache
-        cache = {k: v.copy() for k, v in cached_files.items()}
-        for c in cache.values():
-            if isinstance(c["blocks"], set):
-                c["blocks"] = list(c["blocks"])
-        fn2 = tempfile.mktemp()
-        with open(fn2, "wb") as f:
-            pickle.dump(cache, f)
-        os.replace(fn2, fn)
+        if paths is None:
+            paths = list(cache)
+        with closing(_connect_metadata(fn)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for path in paths:
+                    if path not in cache:
+                        continue
+                    detail = cache[path].copy()
+                    row = conn.execute(
+                        "SELECT detail FROM files WHERE path = ?", (path,)
+                    ).fetchone()
+                    if row is not None:
+                        stored = _blocks_to_bitmaps({path: pickle.loads(row[0])})
+                        detail["blocks"] = _merge_blocks(
+                            detail["blocks"], stored[path]["blocks"]
+                        )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?)",
+                        (path, pickle.dumps(detail)),
+                    )
+                conn.execute("UPDATE version SET version = version + 1")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
 
     def _check_cache(self):
-        """Reload caches if time elapsed or any disappeared"""
+        """Reload caches if changed since the last check, or any disappeared"""
         if not self.cache_check:
             # explicitly told not to bother checking
             return
         timecond = time.time() - self.last_cache > self.cache_check
         existcond = all(os.path.exists(storage) for storage in self.storage)
-        if timecond or not existcond:
+        if not existcond:
             self.load_cache()
+        elif timecond:
+            # a cheap query tells whether anything was saved meanwhile
+            versions = [
+                _metadata_version(os.path.join(storage, "cache"))
+                for storage in self.storage
+            ]
+            if None in versions or versions != self.cache_versions:
+                self.load_cache()
+            else:
+                self.last_cache = time.time()
 
     def _check_file(self, path):
         """Is path in cache and still valid"""
@@ -182,13 +235,79 @@ class CachingFileSystem(AbstractFileSystem):
                 if detail["uid"] != self.fs.ukey(path):
                     continue
             if self.expiry:
-                if detail["time"] - time.time() > self.expiry:
+                if time.time() - detail["time"] > self.expiry:
                     continue
             fn = os.path.join(storage, detail["fn"])
             if os.path.exists(fn):
+                self._touch(fn)
                 return detail, fn
         return False, None
 
+    def _touch(self, fn):
+        """Record use of a cached file, for least-recently-used eviction"""
+        if self.max_size:
+            try:
+                os.utime(fn)
+            except OSError:
+                # read-only storage
+                pass
+
+    def _evict(self, incoming=0):
+        """Delete least recently used files, to leave room for ``incoming`` bytes
+
+        Only applies to the writable storage, if ``max_size`` is set.
+        """
+        if not self.max_size:
+            return
+        storage = self.storage[-1]
+        known = {d["fn"] for d in self.cached_files[-1].values()}
+        files = []
+        total = 0
+        for entry in os.scandir(storage):
+            name = entry.name
+            # the storage may be shared with other processes: their metadata,
+            # sqlite journals and partial downloads are never evicted
+            if (
+                name.startswith(("cache", _TEMP_PREFIX))
+                or not (self.same_names or name in known or _is_hash_name(name))
+                or not entry.is_file()
+            ):
+                continue
+            st = entry.stat()
+            # sparse files, as made by blockcache, only use their written blocks
+            used = min(st.st_size, getattr(st, "st_blocks", math.inf) * 512)
+            files.append((st.st_mtime, entry.name, used))
+            total += used
+        if total + incoming <= self.max_size:
+            return
+        removed = []
+        for _, name, used in sorted(files):
+            if total + incoming <= self.max_size:
+                break
+            if name in self._in_use:
+                continue
+            try:
+                os.remove(os.path.join(storage, name))
+            except OSError:
+                continue
+            total -= used
+            removed.append(name)
+        logger.debug("Evicted %i files from %s", len(removed), storage)
+        self._forget(removed)
+
+    def _forget(self, names):
+        """Drop the metadata of the cached files ``names`` from the storage"""
+        if not names:
+            return
+        names = set(names)
+        cache = self.cached_files[-1]
+        for path in [p for p, d in cache.items() if d["fn"] in names]:
+            del cache[path]
+        fn = os.path.join(self.storage[-1], "cache")
+        if os.path.exists(fn):
+            _migrate_metadata(fn)
+            _delete_metadata(fn, names)
+
     def _open(
         self,
         path,
@@ -218,7 +337,7 @@ class CachingFileSystem(AbstractFileSystem):
             store_path = path
         path = self.fs._strip_protocol(store_path)
         if "r" not in mode:
-            return self.fs._open(
+            f = self.fs._open(
                 path,
                 mode=mode,
                 block_size=block_size,
@@ -226,6 +345,7 @@ class CachingFileSystem(AbstractFileSystem):
                 cache_options=cache_options,
                 **kwargs
             )
+            return self._write_through(f, path, store_path, mode)
         detail, fn = self._check_file(store_path)
         if detail:
             # file is in cache
@@ -239,7 +359,7 @@ class CachingFileSystem(AbstractFileSystem):
         else:
             hash = hash_name(path, self.same_names)
             fn = os.path.join(self.storage[-1], hash)
-            blocks = set()
+            blocks = BlockBitmap()
             detail = {
                 "fn": hash,
                 "blocks": blocks,
@@ -248,6 +368,7 @@ class CachingFileSystem(AbstractFileSystem):
             }
             self.cached_files[-1][store_path] = detail
             logger.debug("Creating local sparse file for %s" % path)
+            self._evict()
 
         # call target filesystems open
         f = self.fs._open(
@@ -276,22 +397,106 @@ class CachingFileSystem(AbstractFileSystem):
         else:
             detail["blocksize"] = f.blocksize
         f.cache = MMapCache(f.blocksize, f._fetch_range, f.size, fn, blocks)
+        f.cache.fetcher_into = getattr(f, "_fetch_range_into", None)
+        self._in_use.add(detail["fn"])
         close = f.close
         f.close = lambda: self.close_and_update(f, close)
-        self.save_cache()
+        self.save_cache([store_path])
         return f
 
     def close_and_update(self, f, close):
         """Called when a file is closing, so store the set of blocks"""
+        if f.closed:
+            # e.g., again on garbage collection; the entry may be evicted
+            return
         path = self._strip_protocol(f.path)
 
         if not path.startswith(self.target_protocol):
             store_path = self.target_protocol + "://" + path
+        else:
+            store_path = path
         c = self.cached_files[-1][store_path]
-        if c["blocks"] is not True and len(["blocks"]) * f.blocksize >= f.size:
+        # blocks are counted in the block size of the cache, which the file's
+        # own may have drifted from
+        if c["blocks"] is not True and c["blocks"].isfull(
+            math.ceil(f.size / c["blocksize"])
+        ):
             c["blocks"] = True
-        self.save_cache()
+        self.save_cache([store_path])
         close()
+        self._in_use.discard(c["fn"])
+        self._evict()
+
+    def _write_through(self, f, path, store_path, mode):
+        """Make file ``f``, open for writing, also fill the local cache
+
+        Data written is teed into a temporary local file. When the upload
+        is committed, i.e., on close or on ``commit()`` within a
+        transaction, it is moved into place and registered as wholly cached;
+        if the upload fails or is discarded, it is deleted.
+        """
+        if (
+            not self.write_through
+            or mode != "wb"
+            or self.compression
+            or not isinstance(f, AbstractBufferedFile)
+        ):
+            return f
+        sha = hash_name(path, self.same_names)
+        fd, tmp = tempfile.mkstemp(dir=self.storage[-1], prefix=_TEMP_PREFIX)
+        local = open(fd, "wb")
+        self._in_use.add(os.path.basename(tmp))
+        write, close = f.write, f.close
+        commit, discard = f.commit, f.discard
+
+        def finish(keep):
+            if local.closed:
+                return
+            local.close()
+            if keep:
+                self._evict()
+                os.replace(tmp, os.path.join(self.storage[-1], sha))
+                self.cached_files[-1][store_path] = {
+                    "fn": sha,
+                    "blocks": True,
+                    "time": time.time(),
+                    "uid": self.fs.ukey(path) if self.check_files else None,
+                }
+                self.save_cache([store_path])
+            else:
+                os.remove(tmp)
+            self._in_use.discard(os.path.basename(tmp))
+
+        def write_through(data):
+            local.write(data)
+            return write(data)
+
+        def close_through():
+            if f.closed:
+                return close()
+            try:
+                close()
+            except BaseException:
+                finish(False)
+                raise
+            if f.autocommit:
+                finish(True)
+            elif not local.closed:
+                local.flush()
+
+        def commit_through():
+            commit()
+            finish(True)
+
+        def discard_through():
+            discard()
+            finish(False)
+
+        f.write = write_through
+        f.close = close_through
+        f.commit = commit_through
+        f.discard = discard_through
+        return f
 
     def __getattribute__(self, item):
         if item in [
@@ -310,6 +515,10 @@ class CachingFileSystem(AbstractFileSystem):
             "head",
             "_check_file",
             "_check_cache",
+            "_touch",
+            "_evict",
+            "_forget",
+            "_write_through",
         ]:
             # all the methods defined in this class. Note `open` here, since
             # it calls `_open`, but is actually in superclass
@@ -371,7 +580,8 @@ class WholeFileCacheFileSystem(CachingFileSystem):
             store_path = path
         path = self.fs._strip_protocol(store_path)
         if "r" not in mode:
-            return self.fs._open(path, mode=mode, **kwargs)
+            f = self.fs._open(path, mode=mode, **kwargs)
+            return self._write_through(f, path, store_path, mode)
         detail, fn = self._check_file(store_path)
         if detail:
             hash, blocks = detail["fn"], detail["blocks"]
@@ -407,12 +617,14 @@ class WholeFileCacheFileSystem(CachingFileSystem):
                 else self.compression
             )
             f = compr[comp](f, mode="rb")
-        with open(fn, "wb") as f2:
+        self._evict(getattr(f, "size", None) or 0)
+        with _atomic_write(fn, self._in_use) as f2:
             if isinstance(f, AbstractBufferedFile):
                 # want no type of caching if just downloading whole thing
                 f.cache = BaseCache(0, f.cache.fetcher, f.size)
-            if getattr(f, "blocksize", 0) and f.size:
-                # opportunity to parallelise here
+            if self.max_workers > 1 and _can_fetch_parallel(f):
+                _fetch_parallel(f, f2, self.max_workers)
+            elif getattr(f, "blocksize", 0) and f.size:
                 data = True
                 while data:
                     data = f.read(f.blocksize)
@@ -420,7 +632,7 @@ class WholeFileCacheFileSystem(CachingFileSystem):
             else:
                 # this only applies to HTTP, should instead use streaming
                 f2.write(f.read())
-        self.save_cache()
+        self.save_cache([store_path])
         return self._open(path, mode)
 
 
@@ -452,9 +664,10 @@ class SimpleCacheFileSystem(CachingFileSystem):
         for storage in self.storage:
             fn = os.path.join(storage, sha)
             if os.path.exists(fn):
+                self._touch(fn)
                 return fn
 
-    def save_cache(self):
+    def save_cache(self, paths=None):
         pass
 
     def load_cache(self):
@@ -469,7 +682,8 @@ class SimpleCacheFileSystem(CachingFileSystem):
             store_path = path
         path = self.fs._strip_protocol(store_path)
         if "r" not in mode:
-            return self.fs._open(path, mode=mode, **kwargs)
+            f = self.fs._open(path, mode=mode, **kwargs)
+            return self._write_through(f, path, store_path, mode)
         fn = self._check_file(path)
         if fn:
             return open(fn, mode)
@@ -479,12 +693,20 @@ class SimpleCacheFileSystem(CachingFileSystem):
         logger.debug("Copying %s to local cache" % path)
         kwargs["mode"] = mode
 
-        with self.fs._open(path, **kwargs) as f, open(fn, "wb") as f2:
+        with self.fs._open(path, **kwargs) as f, _atomic_write(
+            fn, self._in_use
+        ) as f2:
+            self._evict(getattr(f, "size", None) or 0)
             if isinstance(f, AbstractBufferedFile):
                 # want no type of caching if just downloading whole thing
                 f.cache = BaseCache(0, f.cache.fetcher, f.size)
-            if getattr(f, "blocksize", 0) and f.size:
-                # opportunity to parallelise here (if not compressed)
+            if (
+                self.max_workers > 1
+                and not self.compression
+                and _can_fetch_parallel(f)
+            ):
+                _fetch_parallel(f, f2, self.max_workers)
+            elif getattr(f, "blocksize", 0) and f.size:
                 if self.compression:
                     comp = (
                         infer_compression(path)
@@ -509,6 +731,216 @@ class SimpleCacheFileSystem(CachingFileSystem):
         return self._open(path, mode)
 
 
+@contextmanager
+def _atomic_write(fn, in_use):
+    """Local file to write, which only appears at ``fn`` once complete
+
+    The name of the temporary file is kept in ``in_use`` meanwhile, so that
+    it is not evicted.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(fn), prefix=_TEMP_PREFIX)
+    name = os.path.basename(tmp)
+    in_use.add(name)
+    try:
+        with open(fd, "wb") as f:
+            yield f
+        os.replace(tmp, fn)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    finally:
+        in_use.discard(name)
+
+
+def _can_fetch_parallel(f):
+    return (
+        isinstance(f, AbstractBufferedFile)
+        and f.size
+        and hasattr(os, "pwrite")
+        # a streaming file reads through a single shared connection
+        and not getattr(f, "streaming", False)
+    )
+
+
+def _fetch_parallel(f, f2, max_workers):
+    """Copy all of ``f`` into the local file ``f2``, in concurrent ranges
+
+    The ranges are of the block size of ``f``, and each is written in place
+    with ``os.pwrite`` into ``f2``, preallocated to the full size.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    fd = f2.fileno()
+    size = f.size
+    os.ftruncate(fd, size)
+    # the block size of ``f`` may be changed by its own fetches, so the
+    # ranges are fixed up front
+    blocksize = f.blocksize
+    ranges = [(i, min(i + blocksize, size)) for i in range(0, size, blocksize)]
+
+    def fetch(span):
+        start, end = span
+        buf = bytearray(end - start)
+        n = f._fetch_range_into(start, memoryview(buf))
+        if n != end - start:
+            raise IOError(
+                "Expected %i bytes of %s at %i, got %i" % (end - start, f, start, n)
+            )
+        view = memoryview(buf)
+        done = 0
+        while done < n:
+            done += os.pwrite(fd, view[done:], start + done)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        list(ex.map(fetch, ranges))
+
+
+def _blocks_to_bitmaps(cached_files):
+    """Convert blocks stored as lists, by older versions, to bitmaps"""
+    for c in cached_files.values():
+        if isinstance(c["blocks"], (list, set)):
+            c["blocks"] = BlockBitmap(c["blocks"])
+    return cached_files
+
+
+def _merge_blocks(a, b):
+    """Union of two sets of blocks, where True means the whole file"""
+    if a is True or b is True:
+        return True
+    return a | b
+
+
+_SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def _is_sqlite(fn):
+    with open(fn, "rb") as f:
+        return f.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+
+
+def _connect_metadata(fn):
+    """Connection to the metadata database, creating the tables if needed"""
+    # autocommit mode: transactions are begun explicitly, and wait for other
+    # processes holding the write lock
+    conn = sqlite3.connect(fn, timeout=60, isolation_level=None)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, detail BLOB)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS version (version INTEGER)")
+    conn.execute(
+        "INSERT INTO version SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM version)"
+    )
+    return conn
+
+
+def _read_metadata(fn):
+    """Entries of a metadata file, and its version (None for a pickle)"""
+    if not _is_sqlite(fn):
+        with open(fn, "rb") as f:
+            return _blocks_to_bitmaps(pickle.load(f)), None
+    with closing(sqlite3.connect(fn, timeout=60)) as conn:
+        try:
+            with conn:
+                rows = conn.execute("SELECT path, detail FROM files").fetchall()
+                version = conn.execute("SELECT version FROM version").fetchone()
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            # made by a writer which stopped before creating the tables
+            return {}, None
+    if version is None:
+        return {}, None
+    version = version[0]
+    cached = {path: pickle.loads(detail) for path, detail in rows}
+    return _blocks_to_bitmaps(cached), version
+
+
+def _metadata_version(fn):
+    """Counter incremented by each save, or None if it cannot be told"""
+    try:
+        if not _is_sqlite(fn):
+            return None
+        with closing(sqlite3.connect(fn, timeout=60)) as conn:
+            return conn.execute("SELECT version FROM version").fetchone()[0]
+    except (OSError, sqlite3.Error):
+        return None
+
+
+#: seconds to wait for another process converting old metadata
+_MIGRATE_LOCK_TIMEOUT = 60
+
+
+def _migrate_metadata(fn):
+    """Convert a metadata file written as a pickle by older versions"""
+    if not os.path.exists(fn) or _is_sqlite(fn):
+        return
+    # one process at a time, so that none replaces the file after another
+    # has converted it and started saving to it
+    lock = fn + ".lock"
+    locked = False
+    deadline = time.time() + _MIGRATE_LOCK_TIMEOUT
+    while True:
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            locked = True
+            break
+        except FileExistsError:
+            if time.time() > deadline:
+                # left behind by a process which died, or still held: go
+                # ahead, but leave the lock to its owner
+                break
+            time.sleep(0.01)
+    try:
+        if _is_sqlite(fn):
+            return
+        with open(fn, "rb") as f:
+            cached = pickle.load(f)
+        fd, fn2 = tempfile.mkstemp(dir=os.path.dirname(fn), prefix=_TEMP_PREFIX)
+        os.close(fd)
+        with closing(_connect_metadata(fn2)) as conn:
+            conn.executemany(
+                "INSERT INTO files VALUES (?, ?)",
+                [(path, pickle.dumps(detail)) for path, detail in cached.items()],
+            )
+        os.replace(fn2, fn)
+    finally:
+        if locked:
+            try:
+                os.remove(lock)
+            except OSError:
+                pass
+
+
+def _delete_metadata(fn, names):
+    """Remove the entries of the local files ``names`` from the metadata"""
+    with closing(_connect_metadata(fn)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute("SELECT path, detail FROM files").fetchall()
+            paths = [
+                (path,)
+                for path, detail in rows
+                if pickle.loads(detail)["fn"] in names
+            ]
+            conn.executemany("DELETE FROM files WHERE path = ?", paths)
+            conn.execute("UPDATE version SET version = version + 1")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+#: prefix of temporary files made in the cache storage
+_TEMP_PREFIX = "tmp-fsspec-"
+
+
+def _is_hash_name(name):
+    return len(name) == 64 and all(c in "0123456789abcdef" for c in name)
+
+
 def hash_name(path, same_name):
     if same_name:
         hash = os.path.basename(path)
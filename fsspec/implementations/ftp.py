@@ -1,6 +1,13 @@
-from ftplib import FTP, Error, error_perm
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from ftplib import FTP, FTP_TLS, Error, error_perm
+import re
+import threading
+import time
 import uuid
+from ..listing import DirEntry
 from ..spec import AbstractBufferedFile, AbstractFileSystem
+from ..transfer import BlockSizeTuner, QueuedWriter
 from ..utils import infer_storage_options
 
 
@@ -21,6 +28,13 @@ class FTPFileSystem(AbstractFileSystem):
         block_size=None,
         tempdir="/tmp",
         timeout=30,
+        compact_listings=False,
+        max_sessions=4,
+        idle_timeout=60,
+        streaming=False,
+        tls=False,
+        ssl_context=None,
+        adaptive_block_size=False,
         **kwargs
     ):
         """
@@ -46,6 +60,40 @@ class FTPFileSystem(AbstractFileSystem):
             If given, the read-ahead or write buffer size.
         tempdir: str
             Directory on remote to put temporary files when in a transaction
+        timeout: float
+            Seconds to wait for the server, and for a free pooled connection
+        compact_listings: bool
+            If True, directory listings are held as ``FTPEntry`` instances,
+            which keep the raw MLSD facts and only parse them on access,
+            rather than as dicts. Saves much memory on very large listings.
+        max_sessions: int
+            Maximum number of logged-in control connections held in this
+            instance's ``FTPSessionPool``; each operation or file transfer
+            checks one out, so this many may run concurrently from threads.
+            ``walk`` and ``find`` also list this many directories at once.
+            Files opened with ``streaming=True`` hold a connection for as
+            long as they are open. An operation waits up to ``timeout``
+            seconds for a free connection, then raises ``TimeoutError``.
+        idle_timeout: float
+            Seconds after which an unused pooled connection is closed rather
+            than reused.
+        streaming: bool
+            Default for the ``streaming`` option of ``open()``, see
+            ``FTPFile``.
+        tls: bool
+            Use explicit FTPS (``AUTH TLS``), with data connections also
+            encrypted. Data connections resume the TLS session of their
+            control connection, saving a full handshake per transfer; some
+            servers insist on this. The default for "ftps://" URLs and
+            ``FTPSFileSystem``.
+        ssl_context: ssl.SSLContext or None
+            Context for FTPS connections, e.g., to trust a private CA; by
+            default, that of ``ftplib.FTP_TLS``.
+        adaptive_block_size: bool
+            Default for the ``adaptive_block_size`` option of ``open()``:
+            if True, the block size of a file grows or shrinks with the
+            observed speed of its transfers, see
+            ``fsspec.transfer.BlockSizeTuner``.
         """
         super(FTPFileSystem, self).__init__(**kwargs)
         self.host = host
@@ -53,16 +101,40 @@ class FTPFileSystem(AbstractFileSystem):
         self.tempdir = tempdir
         self.cred = username, password, acct
         self.timeout = timeout
+        self.compact_listings = compact_listings
+        self.streaming = streaming
+        self.tls = tls
+        self.ssl_context = ssl_context
+        self.adaptive_block_size = adaptive_block_size
         if block_size is not None:
             self.blocksize = block_size
         else:
             self.blocksize = 2 ** 16
-        self._connect()
+        self.pool = FTPSessionPool(
+            self._connect,
+            max_size=max_sessions,
+            idle_timeout=idle_timeout,
+            wait_timeout=timeout,
+        )
+        with self._session():
+            # connect and log in now, so that bad details fail early
+            pass
 
     def _connect(self):
-        self.ftp = FTP(timeout=self.timeout)
-        self.ftp.connect(self.host, self.port)
-        self.ftp.login(*self.cred)
+        """Make a new logged-in control connection"""
+        if self.tls:
+            ftp = _FTPTLS(context=self.ssl_context, timeout=self.timeout)
+        else:
+            ftp = FTP(timeout=self.timeout)
+        ftp.connect(self.host, self.port)
+        ftp.login(*self.cred)
+        if self.tls:
+            ftp.prot_p()
+        return ftp
+
+    def _session(self):
+        """Context manager checking out a control connection from the pool"""
+        return self.pool.session()
 
     @classmethod
     def _strip_protocol(cls, path):
@@ -72,7 +144,8 @@ class FTPFileSystem(AbstractFileSystem):
     def _get_kwargs_from_urls(urlpath):
         out = infer_storage_options(urlpath)
         out.pop("path", None)
-        out.pop("protocol", None)
+        if out.pop("protocol", None) == "ftps":
+            out["tls"] = True
         return out
 
     def ls(self, path, detail=True, **kwargs):
@@ -80,25 +153,19 @@ class FTPFileSystem(AbstractFileSystem):
         out = []
         if path not in self.dircache:
             try:
-                try:
-                    out = [
-                        (fn, details)
-                        for (fn, details) in self.ftp.mlsd(path)
-                        if fn not in [".", ".."]
-                        and details["type"] not in ["pdir", "cdir"]
-                    ]
-                except error_perm:
-                    out = _mlsd2(self.ftp, path)  # Not platform independent
-                for fn, details in out:
-                    if path == "/":
-                        path = ""  # just for forming the names, below
-                    details["name"] = "/".join([path, fn.lstrip("/")])
-                    if details["type"] == "file":
-                        details["size"] = int(details["size"])
-                    else:
-                        details["size"] = 0
-                    if details["type"] == "dir":
-                        details["type"] = "directory"
+                with self._session() as ftp:
+                    out = _list_dir(ftp, path, compact=self.compact_listings)
+                if not self.compact_listings:
+                    for fn, details in out:
+                        if path == "/":
+                            path = ""  # just for forming the names, below
+                        details["name"] = "/".join([path, fn.lstrip("/")])
+                        if details["type"] == "file":
+                            details["size"] = int(details["size"])
+                        else:
+                            details["size"] = 0
+                        if details["type"] == "dir":
+                            details["type"] = "directory"
                 self.dircache[path] = out
             except Error:
                 try:
@@ -107,21 +174,129 @@ class FTPFileSystem(AbstractFileSystem):
                         out = [(path, info)]
                 except (Error, IndexError):
                     raise FileNotFoundError
-        files = self.dircache.get(path, out)
+        return self._ls_out(self.dircache.get(path, out), detail)
+
+    @staticmethod
+    def _ls_out(files, detail):
         if not detail:
             return sorted([fn for fn, details in files])
         return [details for fn, details in files]
 
+    def invalidate_cache(self, path=None):
+        if path is None:
+            self.dircache.clear()
+        else:
+            path = self._strip_protocol(path)
+            while path:
+                self.dircache.pop(path, None)
+                path = path.rsplit("/", 1)[0]
+            # the root listing is stored under ""
+            self.dircache.pop("", None)
+
+    def walk(self, path, maxdepth=None, **kwargs):
+        # list the whole tree concurrently first, then walk the dircache
+        self._list_tree(path, maxdepth=maxdepth)
+        return super().walk(path, maxdepth=maxdepth, **kwargs)
+
+    def _list_tree(self, path, maxdepth=None):
+        """Breadth-first listing of a directory tree into the dircache
+
+        Each level of the tree is listed with up to ``max_sessions``
+        directories in flight at once, each on its own control connection.
+        Does nothing if ``path`` is already cached, such as when called again
+        for the subdirectories of a walk.
+        """
+        path = self._strip_protocol(path)
+        if path in self.dircache or self.pool.max_size < 2:
+            return
+        level = [path]
+        depth = 0
+        with ThreadPoolExecutor(max_workers=self.pool.max_size) as ex:
+            while level:
+                listings = list(ex.map(self._try_ls, level))
+                depth += 1
+                if maxdepth is not None and depth >= maxdepth:
+                    break
+                level = [
+                    info["name"]
+                    for parent, listing in zip(level, listings)
+                    for info in listing
+                    if info["type"] == "directory" and info["name"] != parent
+                ]
+
+    def _try_ls(self, path):
+        try:
+            return self.ls(path, detail=True)
+        except (FileNotFoundError, IOError):
+            return []
+
     def info(self, path, **kwargs):
-        # implement with direct method
+        """Details of a single path
+
+        Uses a cached listing of the parent if there is one; otherwise asks
+        the server about this path alone, with ``MLST`` or, failing that,
+        ``SIZE`` and ``MDTM``. Only if neither is supported, or the path
+        may be a directory which ``SIZE`` cannot describe, is the parent
+        directory listed.
+        """
         path = self._strip_protocol(path)
-        files = self.ls(self._parent(path).lstrip("/"), True)
+        parent = self._parent(path).lstrip("/")
+        if self._strip_protocol(parent) not in self.dircache:
+            with self._session() as ftp:
+                out = self._info_direct(ftp, path)
+            if out is not None:
+                return out
+        files = self.ls(parent, True)
         try:
             out = [f for f in files if f["name"] == path][0]
         except IndexError:
             raise FileNotFoundError(path)
         return out
 
+    def _info_direct(self, ftp, path):
+        """Info for one path with MLST or SIZE/MDTM, or None if undecided"""
+        features = _features(ftp)
+        if "MLST" in features:
+            try:
+                resp = ftp.sendcmd("MLST %s" % path)
+            except error_perm:
+                raise FileNotFoundError(path)
+            lines = resp.splitlines()
+            if len(lines) < 3:
+                return None
+            facts, _, _ = lines[1].strip().partition(" ")
+            details = {}
+            for fact in facts.split(";"):
+                key, _, value = fact.partition("=")
+                if key:
+                    details[key.lower()] = value
+            kind = details.pop("type", "file").lower()
+            kind = "file" if kind == "file" else "directory"
+            size = int(details.pop("size", 0)) if kind == "file" else 0
+            if self.compact_listings:
+                return FTPEntry(path, size, kind, facts)
+            details.update(name=path, size=size, type=kind)
+            return details
+        if "SIZE" in features:
+            try:
+                ftp.voidcmd("TYPE I")
+                size = ftp.size(path)
+            except error_perm:
+                # not a file, or no such path: cannot tell which
+                return None
+            details = {}
+            if "MDTM" in features:
+                try:
+                    resp = ftp.sendcmd("MDTM %s" % path)
+                    details["modify"] = resp[4:].strip()
+                except error_perm:
+                    pass
+            if self.compact_listings:
+                return FTPEntry(path, size, "file", **details)
+            details.update(name=path, size=size, type="file")
+            return details
+        return None
+
     def _open(
         self,
         path,
@@ -129,6 +304,8 @@ class FTPFileSystem(AbstractFileSystem):
         block_size=None,
         cache_options=None,
         autocommit=True,
+        streaming=None,
+        adaptive_block_size=None,
         **kwargs
     ):
         path = self._strip_protocol(path)
@@ -141,30 +318,285 @@ class FTPFileSystem(AbstractFileSystem):
             tempdir=self.tempdir,
             autocommit=autocommit,
             cache_options=cache_options,
+            streaming=self.streaming if streaming is None else streaming,
+            adaptive_block_size=(
+                self.adaptive_block_size
+                if adaptive_block_size is None
+                else adaptive_block_size
+            ),
         )
 
     def _rm(self, path):
         path = self._strip_protocol(path)
-        self.ftp.delete(path)
+        with self._session() as ftp:
+            ftp.delete(path)
         self.invalidate_cache(path.rsplit("/", 1)[0])
 
     def mkdir(self, path, **kwargs):
         path = self._strip_protocol(path)
-        self.ftp.mkd(path)
+        with self._session() as ftp:
+            ftp.mkd(path)
 
     def rmdir(self, path):
         path = self._strip_protocol(path)
-        self.ftp.rmd(path)
+        with self._session() as ftp:
+            ftp.rmd(path)
 
     def mv(self, path1, path2, **kwargs):
         path1 = self._strip_protocol(path1)
         path2 = self._strip_protocol(path2)
-        self.ftp.rename(path1, path2)
+        with self._session() as ftp:
+            ftp.rename(path1, path2)
         self.invalidate_cache(self._parent(path1))
         self.invalidate_cache(self._parent(path2))
 
+    def copy_to(
+        self, fs_dst, src, dst, block_size=None, verify=True, max_workers=None, **kwargs
+    ):
+        """Copy files from this server to another filesystem, such as S3
+
+        Each file is received with a single ``RETR`` and written to a file
+        opened on ``fs_dst``, through a ``fsspec.transfer.QueuedWriter`` so
+        that receiving continues while the destination uploads a block.
+        The destination is written with ``autocommit=False`` and only
+        committed once complete, so a failed copy leaves nothing behind.
+
+        Parameters
+        ----------
+        fs_dst: AbstractFileSystem
+            Where to write
+        src: str
+            Path on this server, may be a glob pattern
+        dst: str
+            Destination path; a directory if ``src`` is a glob, under which
+            each match keeps its path relative to the directory part of
+            ``src`` before the first wildcard
+        block_size: int or None
+            Block size of the destination files (e.g., the S3 part size);
+            by default, ``fs_dst.default_block_size`` if it has one.
+        verify: bool
+            Check that the number of bytes copied matches the size listed
+            by the server (the MLSD/MLST ``size`` fact), and discard the
+            destination file if not.
+        max_workers: int or None
+            How many files to copy at once, each on its own control
+            connection; default ``max_sessions``.
+        kwargs: passed to ``fs_dst.open``
+
+        Returns
+        -------
+        List of destination paths written
+        """
+        from glob import has_magic
+
+        src = self._strip_protocol(src)
+        if has_magic(src):
+            # keep the paths of matches relative to the directory globbed,
+            # so that files of the same name in subdirectories stay apart
+            ind = min(i for i in map(src.find, "*?[") if i >= 0)
+            root = src[: src[:ind].rfind("/") + 1]
+            dst = dst.rstrip("/")
+            pairs = [
+                (info, dst + "/" + p[len(root) :].lstrip("/"))
+                for p, info in sorted(self.glob(src, detail=True).items())
+                if info["type"] == "file"
+            ]
+        else:
+            pairs = [(self.info(src), dst)]
+        block_size = block_size or getattr(fs_dst, "default_block_size", None)
+        if max_workers is None:
+            max_workers = self.pool.max_size
+        if len(pairs) < 2 or max_workers < 2:
+            for info, d in pairs:
+                self._copy_one(fs_dst, info, d, block_size, verify, **kwargs)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as ex:
+                futs = [
+                    ex.submit(
+                        self._copy_one, fs_dst, info, d, block_size, verify, **kwargs
+                    )
+                    for info, d in pairs
+                ]
+                for fut in futs:
+                    fut.result()
+        return [d for _, d in pairs]
+
+    def _copy_one(self, fs_dst, info, dst, block_size, verify, **kwargs):
+        src, size = info["name"], info["size"]
+        open_kw = dict(kwargs, autocommit=False)
+        if block_size:
+            open_kw["block_size"] = block_size
+        f = fs_dst.open(dst, "wb", **open_kw)
+        try:
+            with QueuedWriter(f, max_bytes=2 * (block_size or self.blocksize)) as q:
+                with self._session() as ftp:
+                    ftp.retrbinary("RETR %s" % src, q.write, blocksize=self.blocksize)
+            f.close()
+            if verify and q.nbytes != size:
+                raise IOError(
+                    "Copied %i bytes of %s, but its size is %i" % (q.nbytes, src, size)
+                )
+        except BaseException:
+            try:
+                f.close()
+            except Exception:
+                pass
+            f.discard()
+            raise
+        f.commit()
+
     def __del__(self):
-        self.ftp.close()
+        pool = getattr(self, "pool", None)
+        if pool is not None:
+            pool.close()
+
+
+class FTPSFileSystem(FTPFileSystem):
+    """FTP over explicit TLS (FTPS), as for "ftps://" URLs
+
+    The same as ``FTPFileSystem``, but with ``tls=True`` by default, so that
+    credentials and data are never sent in the clear.
+    """
+
+    protocol = "ftps"
+
+    def __init__(self, host, tls=True, **kwargs):
+        super(FTPSFileSystem, self).__init__(host, tls=tls, **kwargs)
+
+
+class FTPSessionPool(object):
+    """Thread-safe pool of logged-in FTP control connections
+
+    ``ftplib.FTP`` objects cannot be shared between concurrent operations,
+    so each operation checks one out with ``session()`` and returns it when
+    done. Up to ``max_size`` connections are made; beyond that, callers
+    wait for one to be returned. Connections are only returned after an
+    operation succeeded or got an error reply from the server; after any
+    other exception, they are dropped.
+
+    Parameters
+    ----------
+    connect: callable
+        Returns a new, logged-in ``ftplib.FTP`` instance
+    max_size: int
+        Maximum number of connections alive at once
+    idle_timeout: float
+        Connections unused for longer than this many seconds are closed
+        instead of being handed out again
+    check_after: float
+        Connections unused for longer than this many seconds are tested
+        with a NOOP before being handed out
+    wait_timeout: float or None
+        How long ``get`` waits for a connection when ``max_size`` are
+        checked out, before raising ``TimeoutError``; None to wait forever.
+        Without a limit, a thread holding all connections, e.g., through
+        open streaming files, would wait for itself forever.
+    """
+
+    def __init__(
+        self, connect, max_size=4, idle_timeout=60, check_after=5, wait_timeout=30
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self.wait_timeout = wait_timeout
+        self._idle = []  # (connection, time returned), most recent last
+        self._count = 0
+        self._cond = threading.Condition()
+
+    def get(self):
+        """Check out a connection; must be given back with ``put``"""
+        if self.wait_timeout is not None:
+            deadline = time.monotonic() + self.wait_timeout
+        while True:
+            ftp = None
+            with self._cond:
+                while ftp is None:
+                    if self._idle:
+                        ftp, last = self._idle.pop()
+                        idle = time.time() - last
+                        if idle > self.idle_timeout:
+                            self._drop(ftp)
+                            ftp = None
+                    elif self._count < self.max_size:
+                        self._count += 1
+                        break
+                    elif self.wait_timeout is None:
+                        self._cond.wait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(
+                                "No FTP connection became free within %s seconds: "
+                                "all %i are in use, perhaps by open streaming "
+                                "files; consider raising max_sessions"
+                                % (self.wait_timeout, self.max_size)
+                            )
+                        self._cond.wait(remaining)
+            if ftp is None:
+                try:
+                    return self.connect()
+                except BaseException:
+                    with self._cond:
+                        self._count -= 1
+                        self._cond.notify()
+                    raise
+            if idle <= self.check_after or self._healthy(ftp):
+                return ftp
+            with self._cond:
+                self._drop(ftp)
+
+    def put(self, ftp, broken=False):
+        """Return a connection to the pool, or discard it if ``broken``"""
+        with self._cond:
+            if broken:
+                self._drop(ftp)
+            else:
+                self._idle.append((ftp, time.time()))
+            self._cond.notify()
+
+    @contextmanager
+    def session(self):
+        ftp = self.get()
+        try:
+            yield ftp
+        except Error:
+            # error reply from the server: the connection is still usable
+            self.put(ftp)
+            raise
+        except BaseException:
+            # network failure, or e.g. a transfer callback raising, which
+            # leaves a reply unread: connection state unknown
+            self.put(ftp, broken=True)
+            raise
+        else:
+            self.put(ftp)
+
+    def close(self):
+        """Close all idle connections"""
+        with self._cond:
+            while self._idle:
+                self._drop(self._idle.pop()[0])
+
+    def _drop(self, ftp):
+        # call with lock held
+        self._count -= 1
+        try:
+            ftp.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _healthy(ftp):
+        try:
+            ftp.voidcmd("NOOP")
+            return True
+        except (Error, OSError, EOFError):
+            return False
+
+    def __len__(self):
+        return self._count
 
 
 class TransferDone(Exception):
@@ -173,8 +605,44 @@ class TransferDone(Exception):
     pass
 
 
+class _FTPTLS(FTP_TLS):
+    """FTP_TLS whose data connections resume the control connection's session"""
+
+    def ntransfercmd(self, cmd, rest=None):
+        conn, size = FTP.ntransfercmd(self, cmd, rest)
+        if self._prot_p:
+            conn = self.context.wrap_socket(
+                conn, server_hostname=self.host, session=self.sock.session
+            )
+        return conn, size
+
+
 class FTPFile(AbstractBufferedFile):
-    """Interact with a remote FTP file with read/write buffering"""
+    """Interact with a remote FTP file with read/write buffering
+
+    By default, each read which misses the cache starts a new ``RETR`` at
+    the required offset and aborts it once enough bytes have arrived. With
+    ``streaming=True``, a single ``RETR`` data connection is instead kept
+    open and sequential reads are served from it as they arrive; it is only
+    restarted when reading backwards or jumping far ahead.
+
+    Likewise for writing: by default, each block is sent with its own
+    ``REST`` and ``STOR``, while with ``streaming=True`` one ``STOR`` data
+    connection is held open for the life of the file and every block is
+    written into it.
+
+    While a streaming transfer is open, the file holds one of the
+    filesystem's ``max_sessions`` pooled connections, so a thread holding
+    them all cannot run other operations; these fail with ``TimeoutError``
+    after waiting ``timeout`` seconds.
+    """
+
+    #: forward jumps up to this many bytes are read through rather than
+    #: restarting a streaming transfer
+    skip_limit = 2 ** 20
+    #: bounds on the block size with ``adaptive_block_size=True``
+    min_block_size = 2 ** 16
+    max_block_size = 2 ** 28
 
     def __init__(
         self,
@@ -185,8 +653,13 @@ class FTPFile(AbstractBufferedFile):
         autocommit=True,
         cache_type="readahead",
         cache_options=None,
+        streaming=False,
+        adaptive_block_size=False,
         **kwargs
     ):
+        self.streaming = streaming
+        self._stream = None
+        self._tuner = None
         super().__init__(
             fs,
             path,
@@ -200,6 +673,18 @@ class FTPFile(AbstractBufferedFile):
         if not autocommit:
             self.target = self.path
             self.path = "/".join([kwargs["tempdir"], str(uuid.uuid4())])
+        if adaptive_block_size:
+            self._tuner = BlockSizeTuner(
+                self.blocksize, self.min_block_size, self.max_block_size
+            )
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            # a write stream is completed by the final flush; this only
+            # aborts a read stream, or a write which failed
+            self._close_stream()
 
     def commit(self):
         self.fs.mv(self.path, self.target)
@@ -208,7 +693,107 @@ class FTPFile(AbstractBufferedFile):
         self.fs.rm(self.path)
 
     def _fetch_range(self, start, end):
-        """Get bytes between given byte limits
+        """Get bytes between given byte limits"""
+        out = bytearray(max(min(end, self.size) - start, 0))
+        n = self._fetch_range_into(start, memoryview(out))
+        return bytes(out) if n == len(out) else bytes(out[:n])
+
+    def _fetch_range_into(self, start, out):
+        """Receive the bytes from ``start`` directly into the buffer ``out``"""
+        t0 = time.perf_counter()
+        if self.streaming:
+            n = self._fetch_range_stream(start, out)
+        else:
+            n = self._fetch_range_retr(start, out)
+        if self._tuner is not None:
+            self._tuner.record(n, time.perf_counter() - t0)
+            self._tuner.apply(self)
+        return n
+
+    def _fetch_range_stream(self, start, out):
+        """Serve the range from the open RETR, if any, restarting as needed"""
+        end = min(start + len(out), self.size)
+        if start >= end:
+            return 0
+        if self._stream is not None:
+            pos = self._stream[2]
+            if start < pos or start - pos > self.skip_limit:
+                self._close_stream()
+        if self._stream is None:
+            ftp = self.fs.pool.get()
+            try:
+                ftp.voidcmd("TYPE I")
+                conn = ftp.transfercmd("RETR %s" % self.path, rest=start or None)
+            except Error:
+                self.fs.pool.put(ftp)
+                raise
+            except BaseException:
+                self.fs.pool.put(ftp, broken=True)
+                raise
+            self._stream = [ftp, conn, start]
+        ftp, conn, pos = self._stream
+        view = out[: end - start]
+        got = 0
+        try:
+            if pos < start:
+                # skip forward over a small gap, rather than restarting
+                scratch = memoryview(bytearray(min(start - pos, 2 ** 16)))
+                while pos < start:
+                    n = conn.recv_into(scratch[: start - pos])
+                    if not n:
+                        break
+                    pos += n
+            while pos == start and got < len(view):
+                n = conn.recv_into(view[got:])
+                if not n:
+                    break
+                got += n
+        except BaseException:
+            self._close_stream(broken=True)
+            raise
+        self._stream[2] = pos + got
+        if pos + got >= self.size or got < len(view):
+            self._finish_stream()
+        return got
+
+    def _finish_stream(self, check=False):
+        """Complete a streaming transfer which has sent all its data
+
+        If ``check``, failure of the transfer, as reported by the server,
+        is raised.
+        """
+        ftp, conn, _ = self._stream
+        self._stream = None
+        try:
+            unwrap = getattr(conn, "unwrap", None)  # TLS data connection
+            if unwrap is not None:
+                unwrap()
+            conn.close()
+            ftp.voidresp()
+        except (Error, OSError, EOFError):
+            self.fs.pool.put(ftp, broken=True)
+            if check:
+                raise
+        else:
+            self.fs.pool.put(ftp)
+
+    def _close_stream(self, broken=False):
+        """Abort any streaming transfer in progress"""
+        if self._stream is None:
+            return
+        ftp, conn, _ = self._stream
+        self._stream = None
+        try:
+            conn.close()
+            if not broken:
+                ftp.abort()
+                ftp.getmultiline()
+        except (Error, OSError, EOFError):
+            broken = True
+        self.fs.pool.put(ftp, broken=broken)
+
+    def _fetch_range_retr(self, start, out):
+        """Get bytes from ``start`` into ``out`` with a new RETR
 
         Implemented by raising an exception in the fetch callback when the
         number of bytes received reaches the requested amount.
@@ -216,23 +801,23 @@ class FTPFile(AbstractBufferedFile):
         Will fail if the server does not respect the REST command on
         retrieve requests.
         """
-        out = []
+        want = len(out)
+        if want == 0:
+            return 0
         total = [0]
 
         def callback(x):
-            total[0] += len(x)
-            if total[0] > end - start:
-                out.append(x[: (end - start) - total[0]])
-                if end < self.size:
-                    raise TransferDone
-            else:
-                out.append(x)
-
-            if total[0] == end - start and end < self.size:
+            got = total[0]
+            n = min(len(x), want - got)
+            out[got : got + n] = memoryview(x)[:n]
+            total[0] = got + n
+            if total[0] == want and start + want < self.size:
                 raise TransferDone
 
+        ftp = self.fs.pool.get()
+        broken = False
         try:
-            self.fs.ftp.retrbinary(
+            ftp.retrbinary(
                 "RETR %s" % self.path,
                 blocksize=self.blocksize,
                 rest=start,
@@ -241,52 +826,262 @@ class FTPFile(AbstractBufferedFile):
         except TransferDone:
             try:
                 # stop transfer, we got enough bytes for this block
-                self.fs.ftp.abort()
-                self.fs.ftp.getmultiline()
-            except Error:
-                self.fs.ftp._connect()
+                ftp.abort()
+                ftp.getmultiline()
+            except (Error, OSError, EOFError):
+                # connection left in unknown state, do not reuse
+                broken = True
+        except Error:
+            raise
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            self.fs.pool.put(ftp, broken=broken)
 
-        return b"".join(out)
+        return total[0]
 
     def _upload_chunk(self, final=False):
-        self.buffer.seek(0)
-        self.fs.ftp.storbinary(
-            "STOR " + self.path, self.buffer, blocksize=self.blocksize, rest=self.offset
-        )
+        t0 = time.perf_counter()
+        if self.streaming:
+            self._upload_chunk_stream(final)
+        else:
+            self.buffer.seek(0)
+            with self.fs._session() as ftp:
+                ftp.storbinary(
+                    "STOR " + self.path,
+                    self.buffer,
+                    blocksize=self.blocksize,
+                    rest=self.offset,
+                )
+        if self._tuner is not None:
+            self._tuner.record(self.buffer.tell(), time.perf_counter() - t0)
+            self._tuner.apply(self)
         return True
 
+    def _upload_chunk_stream(self, final=False):
+        """Send the buffer down the STOR kept open since the first block"""
+        if self._stream is None:
+            ftp = self.fs.pool.get()
+            try:
+                ftp.voidcmd("TYPE I")
+                conn = ftp.transfercmd("STOR %s" % self.path)
+            except Error:
+                self.fs.pool.put(ftp)
+                raise
+            except BaseException:
+                self.fs.pool.put(ftp, broken=True)
+                raise
+            self._stream = [ftp, conn, 0]
+        conn = self._stream[1]
+        try:
+            with self.buffer.getbuffer() as data:
+                conn.sendall(data)
+                self._stream[2] += len(data)
+        except BaseException:
+            self._close_stream(broken=True)
+            raise
+        if final:
+            self._finish_stream(check=True)
+
+
+class FTPEntry(DirEntry):
+    """Compact listing entry for FTP, see ``FTPFileSystem(compact_listings=)``
+
+    Only name, size and type are held as attributes; the remaining MLSD facts
+    are kept as the raw fact string sent by the server, and parsed on access.
+    """
+
+    __slots__ = ("_facts",)
+
+    def __init__(self, name, size, type, facts="", **extra):
+        self._facts = facts
+        super().__init__(name, size, type, **extra)
 
-def _mlsd2(ftp, path="."):
+    def _parse_facts(self):
+        out = {}
+        for fact in self._facts.split(";"):
+            key, _, value = fact.partition("=")
+            if key:
+                out[key.lower()] = value
+        return out
+
+    def _get_extra(self, key):
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        facts = self._parse_facts()
+        if key in facts and key not in ("type", "size"):
+            return facts[key]
+        raise KeyError(key)
+
+    def _extra_keys(self):
+        yield from super()._extra_keys()
+        for key in self._parse_facts():
+            if key not in ("type", "size") and key not in (self._extra or ()):
+                yield key
+
+
+#: replies meaning that a command is not implemented at all
+_NOT_IMPLEMENTED = ("500", "502", "504")
+
+
+def _list_dir(ftp, path, compact=False):
+    """List ``path`` with MLSD if the server supports it, else with LIST
+
+    Whether MLSD is supported is found out by trying it, since servers
+    may support it without announcing it in reply to FEAT. A reply that it
+    is not implemented is remembered on the connection, so that later
+    listings go straight to LIST.
+    """
+    if getattr(ftp, "fsspec_mlsd", True):
+        try:
+            if compact:
+                out = _mlsd_compact(ftp, path)
+            else:
+                out = [
+                    (fn, details)
+                    for (fn, details) in ftp.mlsd(path)
+                    if fn not in [".", ".."]
+                    and details["type"] not in ["pdir", "cdir"]
+                ]
+            ftp.fsspec_mlsd = True
+            return out
+        except error_perm as e:
+            if str(e)[:3] in _NOT_IMPLEMENTED:
+                ftp.fsspec_mlsd = False
+    return _mlsd2(ftp, path, compact=compact)
+
+
+def _mlsd_compact(ftp, path):
+    """List ``path`` with MLSD, returning ``(fn, FTPEntry)`` pairs"""
+    lines = []
+    ftp.retrlines("MLSD %s" % path, lines.append)
+    prefix = "" if path == "/" else path
+    out = []
+    for line in lines:
+        facts, _, fn = line.rstrip("\r\n").partition(" ")
+        if fn in [".", ".."]:
+            continue
+        kind = ""
+        size = 0
+        for fact in facts.split(";"):
+            key, _, value = fact.partition("=")
+            key = key.lower()
+            if key == "type":
+                kind = value.lower()
+            elif key == "size":
+                size = value
+        if kind in ["pdir", "cdir"]:
+            continue
+        if kind == "dir":
+            kind = "directory"
+        size = int(size) if kind == "file" else 0
+        name = "/".join([prefix, fn.lstrip("/")])
+        out.append((fn, FTPEntry(name, size, kind, facts)))
+    return out
+
+
+def _features(ftp):
+    """Extensions announced by the server in reply to FEAT, as {name: params}
+
+    Asked only once per connection; the result is stored on the connection.
+    An empty dict is returned if the server does not understand FEAT.
+    """
+    try:
+        return ftp.fsspec_features
+    except AttributeError:
+        pass
+    features = {}
+    try:
+        resp = ftp.sendcmd("FEAT")
+    except error_perm:
+        resp = ""
+    for line in resp.splitlines()[1:-1]:
+        name, _, params = line.strip().partition(" ")
+        if name:
+            features[name.upper()] = params
+    ftp.fsspec_features = features
+    return features
+
+
+_LIST_UNIX = re.compile(
+    r"^(?P<mode>[-bcdlps][-rwxsStT]{9}[.+@]?)\s+\d+\s+(?P<owner>\S+)\s+"
+    r"(?P<group>\S+)\s+(?P<size>\d+)\s+"
+    r"(?P<modify>[A-Za-z]{3}\s+\d{1,2}\s+(?:\d{1,2}:\d{2}|\d{4}))\s(?P<name>.+)$"
+)
+_LIST_WINDOWS = re.compile(
+    r"^(?P<modify>\d{2}-\d{2}-\d{2,4}\s+\d{1,2}:\d{2}(?:[AaPp][Mm])?)\s+"
+    r"(?:(?P<dir><DIR>)|(?P<size>\d+))\s+(?P<name>.+)$"
+)
+
+
+def _parse_list_line(line):
+    """Turn one line of LIST output into ``(fn, facts)``, or None
+
+    Understands the ``ls -l`` style of Unix servers and the MS-DOS style of
+    IIS; other lines, such as the "total" header, give None. File names may
+    contain spaces; the target of a symlink is dropped from its name.
+    """
+    match = _LIST_UNIX.match(line)
+    if match:
+        mode = match.group("mode")
+        fn = match.group("name")
+        if mode[0] == "l":
+            fn = fn.split(" -> ", 1)[0]
+        return (
+            fn,
+            {
+                "modify": match.group("modify"),
+                "unix.owner": match.group("owner"),
+                "unix.group": match.group("group"),
+                "unix.mode": mode,
+                "size": match.group("size"),
+                "type": "dir" if mode[0] == "d" else "file",
+            },
+        )
+    match = _LIST_WINDOWS.match(line)
+    if match:
+        isdir = match.group("dir") is not None
+        return (
+            match.group("name"),
+            {
+                "modify": match.group("modify"),
+                "size": "0" if isdir else match.group("size"),
+                "type": "dir" if isdir else "file",
+            },
+        )
+    return None
+
+
+def _mlsd2(ftp, path=".", compact=False):
     """
     Fall back to using `dir` instead of `mlsd` if not supported.
 
-    This parses a Linux style `ls -l` response to `dir`, but the response may
-    be platform dependent.
+    This parses the response to `dir` in the Unix ``ls -l`` or Windows
+    styles, see ``_parse_list_line``; lines in other formats are skipped.
 
     Parameters
     ----------
     ftp: ftplib.FTP
     path: str
         Expects to be given path, but defaults to ".".
+    compact: bool
+        Return fully-formed ``FTPEntry`` instances instead of raw fact dicts
     """
     lines = []
     minfo = []
     ftp.dir(path, lines.append)
+    prefix = "" if path == "/" else path
     for line in lines:
-        line = line.split()
-        this = (
-            line[-1],
-            {
-                "modify": " ".join(line[5:8]),
-                "unix.owner": line[2],
-                "unix.group": line[3],
-                "unix.mode": line[0],
-                "size": line[4],
-            },
-        )
-        if "d" == this[1]["unix.mode"][0]:
-            this[1]["type"] = "dir"
-        else:
-            this[1]["type"] = "file"
+        this = _parse_list_line(line)
+        if this is None or this[0] in [".", ".."]:
+            continue
+        if compact:
+            fn, details = this
+            kind = "directory" if details.pop("type") == "dir" else "file"
+            size = details.pop("size")
+            size = int(size) if kind == "file" else 0
+            name = "/".join([prefix, fn.lstrip("/")])
+            this = fn, FTPEntry(name, size, kind, **details)
         minfo.append(this)
     return minfo
@@ -298,14 +298,9 @@ class HTTPFile(AbstractBufferedFile):
         and then stream the output - if the data size is bigger than we
         requested, an exception is raised.
         """
-        kwargs = self.kwargs.copy()
-        headers = kwargs.pop("headers", {})
-        headers["Range"] = "bytes=%i-%i" % (start, end - 1)
-        r = self.session.get(self.url, headers=headers, stream=True, **kwargs)
-        if r.status_code == 416:
-            # range request outside file
+        r = self._range_request(start, end)
+        if r is None:
             return b""
-        r.raise_for_status()
         if r.status_code == 206:
             # partial content, as expected
             out = r.content
@@ -336,6 +331,47 @@ class HTTPFile(AbstractBufferedFile):
             out = b"".join(out)
         return out
 
+    def _fetch_range_into(self, start, out):
+        """Download a block of data directly into the buffer ``out``
+
+        The response is written chunk by chunk as it arrives, without first
+        collecting the whole body; size checks are as for ``_fetch_range``.
+        """
+        end = start + len(out)
+        r = self._range_request(start, end)
+        if r is None:
+            return 0
+        if r.status_code != 206 and "Content-Length" in r.headers:
+            cl = int(r.headers["Content-Length"])
+            if cl > end - start:
+                raise ValueError(
+                    "Got more bytes (%i) than requested (%i)" % (cl, end - start)
+                )
+        n = 0
+        for chunk in r.iter_content(chunk_size=2 ** 20):
+            if not chunk:
+                break
+            if n + len(chunk) > len(out):
+                raise ValueError(
+                    "Got more bytes so far (>%i) than requested (%i)"
+                    % (n + len(chunk), end - start)
+                )
+            out[n : n + len(chunk)] = chunk
+            n += len(chunk)
+        return n
+
+    def _range_request(self, start, end):
+        """Streaming GET of the given range, or None if it is outside the file"""
+        kwargs = self.kwargs.copy()
+        headers = kwargs.pop("headers", {}).copy()
+        headers["Range"] = "bytes=%i-%i" % (start, end - 1)
+        r = self.session.get(self.url, headers=headers, stream=True, **kwargs)
+        if r.status_code == 416:
+            # range request outside file
+            return None
+        r.raise_for_status()
+        return r
+
     def close(self):
         pass
 
@@ -209,6 +209,13 @@ class LocalFileOpener(object):
         self.f.seek(start)
         return self.f.read(end - start)
 
+    def _fetch_range_into(self, start, out):
+        if "r" not in self.mode:
+            raise ValueError
+        self._open()
+        self.f.seek(start)
+        return self.f.readinto(out)
+
     def __setstate__(self, state):
         if "r" in state["mode"]:
             loc = self.state.pop("loc")
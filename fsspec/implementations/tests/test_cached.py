@@ -3,9 +3,16 @@ import shutil
 import pickle
 import pytest
 import tempfile
+import time
 
 import fsspec
-from fsspec.implementations.cached import CachingFileSystem
+from fsspec.implementations.cached import (
+    CachingFileSystem,
+    hash_name,
+    _can_fetch_parallel,
+    _fetch_parallel,
+)
+from fsspec.spec import AbstractBufferedFile
 from fsspec.compression import compr
 from .test_ftp import FTPFileSystem
 
@@ -97,6 +104,371 @@ def test_blocksize(ftp_writable):
         fs.open("/out_block", block_size=30)
 
 
+def test_blocks_bitmap(ftp_writable):
+    from fsspec.caching import BlockBitmap
+
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw)
+    with fs.open("/out_block", "wb") as f:
+        f.write(b"test" * 4000)
+    storage = tempfile.mkdtemp()
+    fs = fsspec.filesystem(
+        "blockcache",
+        target_protocol="ftp",
+        target_options={"host": host, "port": port, "username": user, "password": pw},
+        cache_storage=storage,
+    )
+    with fs.open("/out_block", block_size=20) as f:
+        f.seek(100)
+        assert f.read(50) == (b"test" * 4000)[100:150]
+    blocks = fs.cached_files[-1]["ftp:///out_block"]["blocks"]
+    assert isinstance(blocks, BlockBitmap)
+    assert set(blocks) == {5, 6, 7}
+    fs.load_cache()
+    assert fs.cached_files[-1]["ftp:///out_block"]["blocks"] == {5, 6, 7}
+
+    # caches pickled by older versions, with lists of blocks, are still
+    # understood, and converted on the next save
+    old = {k: v.copy() for k, v in fs.cached_files[-1].items()}
+    old["ftp:///out_block"]["blocks"] = [5, 6, 7]
+    with open(os.path.join(storage, "cache"), "wb") as f:
+        pickle.dump(old, f)
+    fs.load_cache()
+    assert fs.cached_files[-1]["ftp:///out_block"]["blocks"] == {5, 6, 7}
+
+    with fs.open("/out_block", block_size=20) as f:
+        assert f.read() == b"test" * 4000
+    assert fs.cached_files[-1]["ftp:///out_block"]["blocks"] is True
+
+
+def test_blockcache_adaptive_block_size(ftp_writable):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw)
+    data = os.urandom(2 ** 20)
+    with fs.open("/out_adaptive", "wb") as f:
+        f.write(data)
+    fs = fsspec.filesystem(
+        "blockcache",
+        target_protocol="ftp",
+        target_options={
+            "host": host,
+            "port": port,
+            "username": user,
+            "password": pw,
+            "adaptive_block_size": True,
+        },
+        cache_storage=tempfile.mkdtemp(),
+        skip_instance_cache=True,
+    )
+    with fs.open("/out_adaptive", block_size=2 ** 16) as f:
+        for i in range(8):
+            assert f.read(2 ** 16) == data[i * 2 ** 16 : (i + 1) * 2 ** 16]
+        assert f.blocksize == f.cache.blocksize
+    # only half was read, so the file is not marked as wholly cached
+    assert fs.cached_files[-1]["ftp:///out_adaptive"]["blocks"] is not True
+    with fs.open("/out_adaptive", block_size=2 ** 16) as f:
+        f.read(2 ** 16)
+        # completeness is counted in blocks of the cache, not of the file
+        f.blocksize = 2 ** 20
+    assert fs.cached_files[-1]["ftp:///out_adaptive"]["blocks"] is not True
+    with fs.open("/out_adaptive", block_size=2 ** 16) as f:
+        assert f.read() == data
+
+
+def test_metadata_shared(tmpdir):
+    from concurrent.futures import ThreadPoolExecutor
+    from fsspec.implementations.cached import _is_sqlite
+
+    origin = str(tmpdir.mkdir("origin"))
+    storage = str(tmpdir.mkdir("storage"))
+    for i in range(11):
+        with open(os.path.join(origin, "f%i" % i), "wb") as f:
+            f.write(b"data%i" % i)
+
+    # a store written by an older version
+    with open(os.path.join(storage, "cache"), "wb") as f:
+        pickle.dump({}, f)
+
+    def worker(i):
+        fs = fsspec.filesystem(
+            "filecache",
+            target_protocol="file",
+            cache_storage=storage,
+            skip_instance_cache=True,
+        )
+        assert fs.cat(os.path.join(origin, "f%i" % i)) == b"data%i" % i
+
+    # independent instances, as in separate processes, saving concurrently
+    with ThreadPoolExecutor(max_workers=10) as ex:
+        for fut in [ex.submit(worker, i) for i in range(10)]:
+            fut.result()
+    assert _is_sqlite(os.path.join(storage, "cache"))
+
+    fs = fsspec.filesystem(
+        "filecache",
+        target_protocol="file",
+        cache_storage=storage,
+        skip_instance_cache=True,
+    )
+    assert len(fs.cached_files[-1]) == 10
+    version = fs.cache_versions[-1]
+    fs.last_cache = 0
+    fs._check_cache()
+    assert fs.cache_versions[-1] == version
+    # reloaded only when another instance saved something
+    worker(10)
+    fs.last_cache = 0
+    fs._check_cache()
+    assert fs.cache_versions[-1] == version + 1
+    assert len(fs.cached_files[-1]) == 11
+
+
+def test_metadata_no_tables(tmpdir):
+    import sqlite3
+    from contextlib import closing
+
+    origin = str(tmpdir.mkdir("origin"))
+    storage = str(tmpdir.mkdir("storage"))
+    fn = os.path.join(origin, "afile")
+    with open(fn, "wb") as f:
+        f.write(b"data")
+    # a writer which stopped after creating the database, before any table
+    with closing(sqlite3.connect(os.path.join(storage, "cache"))) as conn:
+        conn.execute("CREATE TABLE other (x INTEGER)")
+    fs = fsspec.filesystem(
+        "filecache",
+        target_protocol="file",
+        cache_storage=storage,
+        skip_instance_cache=True,
+    )
+    assert fs.cached_files[-1] == {}
+    assert fs.cat(fn) == b"data"
+    fs2 = fsspec.filesystem(
+        "filecache",
+        target_protocol="file",
+        cache_storage=storage,
+        skip_instance_cache=True,
+    )
+    assert list(fs2.cached_files[-1]) == ["file://" + fn]
+
+
+def test_migrate_metadata_lock_held(tmpdir, monkeypatch):
+    from fsspec.implementations import cached
+    from fsspec.implementations.cached import _is_sqlite, _migrate_metadata
+
+    fn = str(tmpdir.join("cache"))
+    with open(fn, "wb") as f:
+        pickle.dump({"path": {"fn": "abc", "blocks": True}}, f)
+    # held by another process, which is taking too long
+    open(fn + ".lock", "wb").close()
+    monkeypatch.setattr(cached, "_MIGRATE_LOCK_TIMEOUT", 0)
+    _migrate_metadata(fn)
+    assert _is_sqlite(fn)
+    assert os.path.exists(fn + ".lock")
+
+
+def test_expiry(tmpdir):
+    origin = str(tmpdir.mkdir("origin"))
+    f1 = os.path.join(origin, "afile")
+    with open(f1, "wb") as f:
+        f.write(b"old")
+    fs = fsspec.filesystem(
+        "filecache",
+        target_protocol="file",
+        cache_storage=str(tmpdir.mkdir("storage")),
+        expiry_time=100,
+        cache_check=False,
+    )
+    assert fs.cat(f1) == b"old"
+    with open(f1, "wb") as f:
+        f.write(b"new")
+    assert fs.cat(f1) == b"old"
+    for detail in fs.cached_files[-1].values():
+        detail["time"] -= 101
+    assert fs.cat(f1) == b"new"
+
+
+@pytest.mark.parametrize("impl", ["filecache", "simplecache"])
+def test_max_size(tmpdir, impl):
+    origin = str(tmpdir.mkdir("origin"))
+    storage = str(tmpdir.mkdir("storage"))
+    paths = []
+    for i in range(5):
+        paths.append(os.path.join(origin, "f%i" % i))
+        with open(paths[-1], "wb") as f:
+            f.write(bytes([i]) * 10000)
+    fs = fsspec.filesystem(
+        impl,
+        target_protocol="file",
+        cache_storage=storage,
+        max_size=25000,
+        skip_instance_cache=True,
+    )
+    # files of other processes sharing the storage, never evicted
+    others = ["cache.lock", "tmp-fsspec-download", "unrelated"]
+    for name in others:
+        with open(os.path.join(storage, name), "wb") as f:
+            f.write(b"0" * 10000)
+
+    def cached():
+        return sorted(
+            f for f in os.listdir(storage) if f != "cache" and f not in others
+        )
+
+    fs.cat(paths[0])
+    time.sleep(0.05)
+    fs.cat(paths[1])
+    time.sleep(0.05)
+    assert len(cached()) == 2
+    # using f0 makes f1 the least recently used
+    fs.cat(paths[0])
+    time.sleep(0.05)
+    fs.cat(paths[2])
+    assert cached() == sorted(hash_name(p, False) for p in [paths[0], paths[2]])
+    for i in range(3, 5):
+        time.sleep(0.05)
+        assert fs.cat(paths[i]) == bytes([i]) * 10000
+    assert len(cached()) == 2
+    assert all(os.path.exists(os.path.join(storage, name)) for name in others)
+    if impl == "filecache":
+        assert len(fs.cached_files[-1]) == 2
+        fs2 = fsspec.filesystem(
+            impl,
+            target_protocol="file",
+            cache_storage=storage,
+            skip_instance_cache=True,
+        )
+        assert sorted(fs2.cached_files[-1]) == ["file://" + p for p in paths[3:]]
+
+
+def test_max_size_blockcache(ftp_writable):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw)
+    for i in range(3):
+        with fs.open("/out%i" % i, "wb") as f:
+            f.write(bytes([i]) * 10000)
+    storage = tempfile.mkdtemp()
+    fs = fsspec.filesystem(
+        "blockcache",
+        target_protocol="ftp",
+        target_options={"host": host, "port": port, "username": user, "password": pw},
+        cache_storage=storage,
+        max_size=15000,
+    )
+    for i in range(3):
+        with fs.open("/out%i" % i, block_size=1000) as f:
+            assert f.read() == bytes([i]) * 10000
+            # files being read are not evicted
+            assert len(os.listdir(storage)) == min(i, 1) + 2
+        time.sleep(0.05)
+    assert sorted(fs.cached_files[-1]) == ["ftp:///out2"]
+
+
+@pytest.mark.parametrize("impl", ["filecache", "simplecache"])
+def test_parallel_download(ftp_writable, impl):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw)
+    data = os.urandom(10000)
+    with fs.open("/out_parallel", "wb") as f:
+        f.write(data)
+    storage = tempfile.mkdtemp()
+    fs = fsspec.filesystem(
+        impl,
+        target_protocol="ftp",
+        target_options={"host": host, "port": port, "username": user, "password": pw},
+        cache_storage=storage,
+        max_workers=4,
+        skip_instance_cache=True,
+    )
+    with fs.open("/out_parallel", block_size=1000) as f:
+        assert f.read() == data
+    # the complete copy was renamed into place, nothing else left behind
+    assert [f for f in os.listdir(storage) if f != "cache"] == [
+        hash_name("/out_parallel", False)
+    ]
+
+
+class ShrinkingFile(AbstractBufferedFile):
+    """Halves its block size on every fetch, like an adaptive block size"""
+
+    data = os.urandom(100000)
+
+    def __init__(self, fs, path, **kwargs):
+        self.details = {"name": path, "size": len(self.data), "type": "file"}
+        super().__init__(fs, path, **kwargs)
+
+    def _fetch_range_into(self, start, out):
+        self.blocksize = max(self.blocksize // 2, 1)
+        part = self.data[start : start + len(out)]
+        out[: len(part)] = part
+        return len(part)
+
+
+def test_parallel_download_block_size_changes(tmpdir):
+    f = ShrinkingFile(None, "shrinking", block_size=10000)
+    assert _can_fetch_parallel(f)
+    fn = str(tmpdir.join("out"))
+    with open(fn, "wb") as f2:
+        _fetch_parallel(f, f2, 4)
+    with open(fn, "rb") as f2:
+        assert f2.read() == f.data
+
+    f.streaming = True
+    assert not _can_fetch_parallel(f)
+
+
+@pytest.mark.parametrize("impl", ["filecache", "simplecache", "blockcache"])
+def test_write_through(ftp_writable, impl):
+    host, port, user, pw = ftp_writable
+    ftp = FTPFileSystem(host, port, user, pw)
+    storage = tempfile.mkdtemp()
+    fs = fsspec.filesystem(
+        impl,
+        target_protocol="ftp",
+        target_options={
+            "host": host,
+            "port": port,
+            "username": user,
+            "password": pw,
+            "tempdir": "",
+        },
+        cache_storage=storage,
+        write_through=True,
+        skip_instance_cache=True,
+    )
+    data = os.urandom(10000)
+    with fs.open("/out_through", "wb") as f:
+        f.write(data)
+    assert ftp.cat("/out_through") == data
+    assert [f for f in os.listdir(storage) if f != "cache"] == [
+        hash_name("/out_through", False)
+    ]
+    # served from the local copy, without touching the remote
+    ftp.rm("/out_through")
+    with fs.open("/out_through") as f:
+        assert f.read() == data
+
+    # nothing is cached for uploads which are discarded
+    f = fs._open("/out_discard", "wb", autocommit=False)
+    f.write(data)
+    f.close()
+    f.discard()
+    assert not ftp.exists("/out_discard")
+    assert [f for f in os.listdir(storage) if f != "cache"] == [
+        hash_name("/out_through", False)
+    ]
+
+    # and committed ones become available on commit
+    f = fs._open("/out_commit", "wb", autocommit=False)
+    f.write(data)
+    f.close()
+    assert hash_name("/out_commit", False) not in os.listdir(storage)
+    f.commit()
+    assert hash_name("/out_commit", False) in os.listdir(storage)
+    with fs.open("/out_commit") as f:
+        assert f.read() == data
+
+
 @pytest.mark.parametrize("impl", ["filecache", "simplecache", "blockcache"])
 def test_local_filecache_creates_dir_if_needed(impl):
     import tempfile
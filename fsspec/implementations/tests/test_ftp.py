@@ -1,10 +1,18 @@
+import ftplib
 import os
 import pytest
 import subprocess
 import sys
 import time
 
-from fsspec.implementations.ftp import FTPFileSystem
+from fsspec.implementations.ftp import (
+    FTPFileSystem,
+    FTPSessionPool,
+    FTPSFileSystem,
+    _features,
+    _list_dir,
+    _parse_list_line,
+)
 from fsspec import open_files
 import fsspec
 
@@ -35,6 +43,269 @@ def test_basic(ftp):
     assert out == open(__file__, "rb").read()
 
 
+def test_compact_listings(ftp):
+    from fsspec.implementations.ftp import FTPEntry
+
+    host, port = ftp
+    fs = FTPFileSystem(host, port, compact_listings=True)
+    assert fs.ls("/", detail=False) == sorted(os.listdir(here))
+    out = fs.ls("/", detail=True)
+    assert all(isinstance(f, FTPEntry) for f in out)
+    info = fs.info("/" + os.path.basename(__file__))
+    assert info["type"] == "file"
+    assert info["size"] == os.path.getsize(__file__)
+    assert "modify" in info
+    assert dict(info)["name"] == info["name"]
+
+
+def test_features_cached(ftp):
+    host, port = ftp
+    fs = FTPFileSystem(host, port)
+    expected = fs.ls("/", detail=False)
+    with fs._session() as conn:
+        assert "MLST" in _features(conn)
+        assert conn.fsspec_mlsd
+        conn.fsspec_mlsd = False  # pretend MLSD is not supported
+    fs.invalidate_cache()
+    out = fs.ls("/", detail=True)
+    assert "unix.mode" in out[0]
+    assert fs.ls("/", detail=False) == expected
+
+    # MLSD is tried even when not announced by FEAT
+    with fs._session() as conn:
+        conn.fsspec_features = {}
+        del conn.fsspec_mlsd
+    fs.invalidate_cache()
+    out = fs.ls("/", detail=True)
+    assert "unix.mode" not in out[0]
+    assert fs.ls("/", detail=False) == expected
+
+
+class NoMLSD(object):
+    def __init__(self):
+        self.commands = []
+
+    def mlsd(self, path):
+        self.commands.append("MLSD")
+        raise ftplib.error_perm("500 Unknown command")
+
+    def dir(self, path, callback):
+        self.commands.append("LIST")
+        callback("-rw-r--r--    1 owner    group        1234 Jan 01 12:00 afile")
+
+
+def test_list_dir_without_mlsd():
+    conn = NoMLSD()
+    assert [fn for fn, _ in _list_dir(conn, "/")] == ["afile"]
+    assert [fn for fn, _ in _list_dir(conn, "/")] == ["afile"]
+    # MLSD only tried once per connection
+    assert conn.commands == ["MLSD", "LIST", "LIST"]
+
+
+def test_info_direct(ftp):
+    host, port = ftp
+    fs = FTPFileSystem(host, port)
+    fn = "/" + os.path.basename(__file__)
+    info = fs.info(fn)
+    assert "/" not in fs.dircache and "" not in fs.dircache
+    assert info["type"] == "file"
+    assert info["size"] == os.path.getsize(__file__)
+    assert "modify" in info
+    assert fs.info("/")["type"] == "directory"
+    with pytest.raises(FileNotFoundError):
+        fs.info("/not-there")
+
+    # without MLST, SIZE and MDTM describe files
+    with fs._session() as conn:
+        features = _features(conn)
+        del features["MLST"]
+    info2 = fs.info(fn)
+    assert info2["size"] == info["size"]
+    assert info2["modify"] == info["modify"]
+    assert not fs.dircache
+
+    # with neither, the parent is listed
+    with fs._session() as conn:
+        del features["SIZE"]
+    assert fs.info(fn) == [f for f in fs.ls("/") if f["name"] == fn][0]
+
+
+def test_ftps_url():
+    out = FTPFileSystem._get_kwargs_from_urls("ftps://user:pw@host:990/path")
+    assert out == {
+        "host": "host",
+        "port": 990,
+        "username": "user",
+        "password": "pw",
+        "tls": True,
+    }
+    assert "tls" not in FTPFileSystem._get_kwargs_from_urls("ftp://host/path")
+
+
+def test_ftps_protocol(monkeypatch):
+    monkeypatch.setattr(FTPFileSystem, "_connect", lambda self: DummyFTP())
+    fs = fsspec.filesystem("ftps", host="host", skip_instance_cache=True)
+    assert isinstance(fs, FTPSFileSystem)
+    assert fs.tls is True
+    fs = fsspec.filesystem("ftp", host="host", skip_instance_cache=True)
+    assert fs.tls is False
+
+
+def test_ftps_data_session_reuse(monkeypatch):
+    import ftplib
+    from fsspec.implementations.ftp import _FTPTLS
+
+    wrapped = {}
+
+    class Context:
+        def wrap_socket(self, sock, **kwargs):
+            wrapped.update(kwargs)
+            return sock
+
+    monkeypatch.setattr(ftplib.FTP, "ntransfercmd", lambda *args: ("conn", None))
+    ftp = _FTPTLS(context=Context())
+    ftp.host = "host"
+    ftp.sock = type("Sock", (), {"session": "tls-session"})()
+    ftp._prot_p = True
+    assert ftp.ntransfercmd("RETR x") == ("conn", None)
+    assert wrapped == {"server_hostname": "host", "session": "tls-session"}
+
+
+class DummyFTP:
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+
+    def voidcmd(self, cmd):
+        if not self.healthy:
+            raise EOFError
+        return "200 OK"
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize(
+    "line,fn,facts",
+    [
+        (
+            "-rw-r--r--    1 owner    group        1234 Jan 01 12:00 my file.txt",
+            "my file.txt",
+            {"size": "1234", "type": "file", "modify": "Jan 01 12:00"},
+        ),
+        (
+            "drwxr-xr-x   2 owner group  4096 Mar  3  2019 a dir",
+            "a dir",
+            {"type": "dir", "unix.owner": "owner", "modify": "Mar  3  2019"},
+        ),
+        (
+            "lrwxrwxrwx 1 owner group 7 Jan 01 12:00 link name -> target",
+            "link name",
+            {"size": "7", "unix.mode": "lrwxrwxrwx"},
+        ),
+        (
+            "01-15-20  09:30AM                 5678 report 2020.csv",
+            "report 2020.csv",
+            {"size": "5678", "type": "file", "modify": "01-15-20  09:30AM"},
+        ),
+        (
+            "01-15-2020  21:30       <DIR>          sub dir",
+            "sub dir",
+            {"size": "0", "type": "dir"},
+        ),
+    ],
+)
+def test_parse_list_line(line, fn, facts):
+    out_fn, out_facts = _parse_list_line(line)
+    assert out_fn == fn
+    for k, v in facts.items():
+        assert out_facts[k] == v
+
+
+def test_parse_list_line_other():
+    assert _parse_list_line("total 42") is None
+
+
+def test_session_pool():
+    made = []
+
+    def connect():
+        made.append(DummyFTP())
+        return made[-1]
+
+    pool = FTPSessionPool(connect, max_size=2, check_after=0)
+    with pool.session() as s1:
+        with pool.session() as s2:
+            assert s1 is not s2
+            assert len(pool) == 2
+    assert len(made) == 2
+    with pool.session() as s3:
+        assert s3 in made
+
+    # network error: connection is dropped, not returned
+    with pytest.raises(EOFError):
+        with pool.session() as s4:
+            raise EOFError
+    assert s4.closed
+    assert len(pool) == 1
+
+    # any other exception may leave a reply unread: dropped too
+    with pytest.raises(ValueError):
+        with pool.session() as s4:
+            raise ValueError
+    assert s4.closed
+    assert len(pool) == 0
+
+    # error reply from the server: connection returned
+    with pytest.raises(ftplib.error_perm):
+        with pool.session() as s4:
+            raise ftplib.error_perm("550 No such file")
+    assert not s4.closed
+    assert len(pool) == 1
+
+    # failing NOOP: connection replaced on checkout
+    pool._idle[0][0].healthy = False
+    with pool.session() as s5:
+        assert s5.healthy
+    assert len(pool) == 1
+
+    # idle timeout
+    pool.idle_timeout = 0
+    time.sleep(0.01)
+    with pool.session() as s6:
+        assert s6 is not s5
+    assert s5.closed
+    pool.close()
+    assert s6.closed
+    assert len(pool) == 0
+
+
+def test_session_pool_blocks_at_max_size():
+    import threading
+
+    pool = FTPSessionPool(DummyFTP, max_size=1)
+    s1 = pool.get()
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.get()))
+    t.start()
+    time.sleep(0.05)
+    assert not got
+    pool.put(s1)
+    t.join(1)
+    assert got == [s1]
+
+
+def test_session_pool_wait_timeout():
+    pool = FTPSessionPool(DummyFTP, max_size=1, wait_timeout=0.1)
+    s1 = pool.get()
+    t0 = time.time()
+    with pytest.raises(TimeoutError):
+        pool.get()
+    assert time.time() - t0 >= 0.1
+    pool.put(s1)
+    assert pool.get() is s1
+
+
 def test_not_cached(ftp):
     host, port = ftp
     fs = FTPFileSystem(host, port)
@@ -101,6 +372,220 @@ def test_write_big(ftp_writable, cache_type):
     assert fs.cat(fn) == b"o" * 1700
 
 
+def test_streaming_holds_sessions(ftp_writable):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw, max_sessions=2, timeout=1)
+    with fs.open("/streamed_a", "wb") as f:
+        f.write(b"a" * 100000)
+    with fs.open("/streamed_b", "wb") as f:
+        f.write(b"b" * 100000)
+    f1 = fs.open("/streamed_a", "rb", streaming=True, block_size=10)
+    f2 = fs.open("/streamed_b", "rb", streaming=True, block_size=10)
+    assert f1.read(10) == b"a" * 10
+    assert f2.read(10) == b"b" * 10
+    fs.invalidate_cache()
+    # both sessions are held by the open streams: fail rather than hang
+    with pytest.raises(TimeoutError):
+        fs.ls("/")
+    f1.close()
+    assert "streamed_a" in fs.ls("/", detail=False)
+    f2.close()
+
+
+def test_streaming_read(ftp_writable):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw, block_size=1000)
+    data = bytes(range(256)) * 20
+    fn = "/streamed"
+    with fs.open(fn, "wb") as f:
+        f.write(data)
+
+    with fs.open(fn, "rb", streaming=True) as f:
+        assert f.read(100) == data[:100]
+        assert f._stream is not None
+        conn = f._stream[1]
+        assert f.read(2000) == data[100:2100]
+        assert f._stream[1] is conn
+        f.seek(50)
+        assert f.read(10) == data[50:60]
+        assert f._stream[1] is not conn
+        f.seek(3000)
+        assert f.read() == data[3000:]
+        assert f._stream is None
+    assert len(fs.pool._idle) == fs.pool._count
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_readinto(ftp_writable, streaming):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw, block_size=1000)
+    data = bytes(range(256)) * 20
+    fn = "/streamed"
+    with fs.open(fn, "wb") as f:
+        f.write(data)
+
+    with fs.open(fn, "rb", streaming=streaming, cache_type="none") as f:
+        buf = bytearray(3000)
+        assert f.readinto(buf) == 3000
+        assert buf == data[:3000]
+        f.seek(3100)
+        assert f.readinto(buf) == len(data) - 3100
+        assert buf[: len(data) - 3100] == data[3100:]
+        assert f.readinto(buf) == 0
+        # _fetch_range goes through the same path
+        assert f._fetch_range(10, 20) == data[10:20]
+    assert len(fs.pool._idle) == fs.pool._count
+
+
+def test_streaming_write(ftp_writable):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw, block_size=1000, streaming=True)
+    fn = "/streamed"
+    with fs.open(fn, "wb") as f:
+        f.write(b"a" * 1500)
+        conn = f._stream[1]
+        f.write(b"b" * 1500)
+        assert f._stream[1] is conn
+        f.write(b"c" * 10)
+    assert f._stream is None
+    assert fs.cat(fn) == b"a" * 1500 + b"b" * 1500 + b"c" * 10
+    assert len(fs.pool._idle) == fs.pool._count
+
+    with fs.open("/empty", "wb"):
+        pass
+    assert fs.cat("/empty") == b""
+
+    fs.mkdir("/tmp")
+    with fs.transaction:
+        with fs.open("/tr", "wb") as f:
+            f.write(b"x" * 2500)
+        assert not fs.exists("/tr")
+    assert fs.cat("/tr") == b"x" * 2500
+
+
+def test_adaptive_block_size(ftp_writable):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw, adaptive_block_size=True)
+    data = b"0123456789" * 100000
+    with fs.open("/adaptive", "wb", block_size=2 ** 16) as f:
+        f.write(data)
+        assert f.blocksize > 2 ** 16  # a local server is fast
+    with fs.open("/adaptive", "rb", block_size=2 ** 16) as f:
+        assert f.read(2 ** 16) == data[: 2 ** 16]
+        assert f.blocksize > 2 ** 16
+        assert f.cache.blocksize == f.blocksize
+        assert f.read() == data[2 ** 16 :]
+
+
+def test_walk_parallel(ftp_writable):
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw, max_sessions=3)
+    expected = []
+    fs.mkdir("/tree")
+    for i in range(3):
+        fs.mkdir("/tree/d%i" % i)
+        for j in range(2):
+            d = "/tree/d%i/e%i" % (i, j)
+            fs.mkdir(d)
+            with fs.open(d + "/file", "wb") as f:
+                f.write(b"data")
+            expected.append(d + "/file")
+    fs.invalidate_cache()
+    assert fs.find("/tree") == expected
+    assert "/tree/d2/e1" in fs.dircache
+    assert len(fs.pool) <= 3
+
+    fs.invalidate_cache()
+    out = list(fs.walk("/tree", maxdepth=2))
+    dirs = sorted(d for d, _, _ in out)
+    assert dirs == ["/tree", "/tree/d0", "/tree/d1", "/tree/d2"]
+    assert "/tree/d0/e0" not in fs.dircache
+
+
+def test_copy_to(ftp_writable, tmp_path_factory):
+    from fsspec.implementations.local import LocalFileSystem
+
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw)
+    local = LocalFileSystem(auto_mkdir=True)
+    d = str(tmp_path_factory.mktemp("dst"))
+    for i in range(3):
+        with fs.open("/part%i.csv" % i, "wb") as f:
+            f.write(b"%i," % i * 1000)
+
+    assert fs.copy_to(local, "/out", d + "/single") == [d + "/single"]
+    assert open(d + "/single", "rb").read() == b"hello" * 10000
+
+    out = fs.copy_to(local, "/part*.csv", d + "/many/", block_size=1000)
+    assert out == [d + "/many/part%i.csv" % i for i in range(3)]
+    for i in range(3):
+        assert open(out[i], "rb").read() == b"%i," % i * 1000
+
+
+def test_copy_to_subdirectories(ftp_writable, tmp_path_factory, monkeypatch):
+    from fsspec.implementations.local import LocalFileSystem
+
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw)
+    d = str(tmp_path_factory.mktemp("dst"))
+    for sub in ["a", "b"]:
+        fs.mkdir("/tree_" + sub)
+        with fs.open("/tree_%s/x.csv" % sub, "wb") as f:
+            f.write(sub.encode() * 100)
+
+    def info(path):
+        raise AssertionError("details come from the glob")
+
+    monkeypatch.setattr(fs, "info", info)
+    out = fs.copy_to(LocalFileSystem(auto_mkdir=True), "/tree_*/x.csv", d)
+    # same names in different directories do not overwrite each other
+    assert out == [d + "/tree_a/x.csv", d + "/tree_b/x.csv"]
+    assert open(out[0], "rb").read() == b"a" * 100
+    assert open(out[1], "rb").read() == b"b" * 100
+
+
+def test_copy_to_verify(ftp_writable, tmp_path_factory, monkeypatch):
+    from fsspec.implementations.local import LocalFileSystem
+
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw)
+    d = str(tmp_path_factory.mktemp("dst"))
+    monkeypatch.setattr(
+        fs, "info", lambda path: {"name": path, "size": 1, "type": "file"}
+    )
+    with pytest.raises(IOError):
+        fs.copy_to(LocalFileSystem(), "/out", d + "/out")
+    assert not os.listdir(d)
+    fs.copy_to(LocalFileSystem(), "/out", d + "/out", verify=False)
+    assert os.listdir(d) == ["out"]
+
+
+def test_copy_to_destination_fails(ftp_writable, tmp_path_factory):
+    from fsspec.implementations.local import LocalFileSystem
+
+    class BrokenFileSystem(LocalFileSystem):
+        def _open(self, path, mode="rb", **kwargs):
+            f = super()._open(path, mode, **kwargs)
+
+            def write(data):
+                raise ValueError("destination failed")
+
+            f.write = write
+            return f
+
+    host, port, user, pw = ftp_writable
+    fs = FTPFileSystem(host, port, user, pw, block_size=1000, max_sessions=1)
+    with fs.open("/big", "wb") as f:
+        f.write(os.urandom(2 ** 20))
+    d = str(tmp_path_factory.mktemp("dst"))
+    with pytest.raises(ValueError):
+        fs.copy_to(BrokenFileSystem(), "/big", d + "/big")
+    assert not os.listdir(d)
+    # the connection interrupted mid-transfer was not reused
+    fs.copy_to(LocalFileSystem(), "/out", d + "/out")
+    assert open(d + "/out", "rb").read() == b"hello" * 10000
+
+
 def test_transaction(ftp_writable):
     host, port, user, pw = ftp_writable
     fs = FTPFileSystem(host, port, user, pw)
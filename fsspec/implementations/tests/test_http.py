@@ -104,6 +104,18 @@ def test_read(server):
         assert f.read(100) + f.read() == data
 
 
+def test_readinto(server):
+    h = fsspec.filesystem("http", headers={"give_length": "true", "head_ok": "true"})
+    url = server + "/index/realfile"
+    with h.open(url, "rb", cache_type="none") as f:
+        buf = bytearray(100)
+        assert f._fetch_range_into(10, memoryview(buf)) == 100
+        assert buf == data[10:110]
+        f.seek(len(data) - 50)
+        assert f.readinto(buf) == 50
+        assert buf[:50] == data[-50:]
+
+
 def test_methods(server):
     h = fsspec.filesystem("http")
     url = server + "/index/realfile"
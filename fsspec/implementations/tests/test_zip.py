@@ -47,3 +47,32 @@ def test_pickle():
         fs = fsspec.get_filesystem_class("zip")(fo=z)
         fs2 = pickle.loads(pickle.dumps(fs))
         assert fs2.cat("b") == b"hello"
+
+
+def test_pin_footer():
+    from fsspec.caching import PinnedCache
+    from fsspec.spec import AbstractBufferedFile
+
+    with tempzip(dict(data, big=b"x" * 1000)) as z:
+        with open(z, "rb") as f:
+            zdata = f.read()
+
+    class ZipBytes(AbstractBufferedFile):
+        def __init__(self, **kwargs):
+            self.details = {"name": "z.zip", "size": len(zdata), "type": "file"}
+            self.calls = []
+            super().__init__(None, "z.zip", block_size=10, **kwargs)
+
+        def _fetch_range(self, start, end):
+            self.calls.append((start, end))
+            return zdata[start:end]
+
+    fo = ZipBytes()
+    fs = fsspec.get_filesystem_class("zip")(fo=fo, pin_footer=300)
+    assert isinstance(fo.cache, PinnedCache)
+    assert fs.cat("big") == b"x" * 1000
+    assert fs.cat("b") == b"hello"
+    assert fs.cat("deeply/nested/path") == b"stuff"
+    # the footer was fetched once, when the directory was read
+    end = len(zdata)
+    assert [c for c in fo.calls if c[0] >= end - 300] == [(end - 300, end)]
@@ -2,6 +2,7 @@ from __future__ import print_function, division, absolute_import
 
 import zipfile
 from fsspec import AbstractFileSystem, open_files
+from fsspec.caching import BaseCache, PinnedCache
 from fsspec.utils import tokenize, DEFAULT_BLOCK_SIZE
 
 
@@ -22,6 +23,7 @@ class ZipFileSystem(AbstractFileSystem):
         target_protocol=None,
         target_options=None,
         block_size=DEFAULT_BLOCK_SIZE,
+        pin_footer=2 ** 16,
         **kwargs
     ):
         """
@@ -38,6 +40,11 @@ class ZipFileSystem(AbstractFileSystem):
         target_options: dict (optional)
             Kwargs passed when instantiating the target FS, if ``fo`` is
             a string.
+        pin_footer: int
+            If ``fo`` is a file with a cache, such as from S3 or FTP, this
+            many bytes at the end of the archive, where the central directory
+            lives, are kept in memory rather than being evicted by reads of
+            members (see ``fsspec.caching.PinnedCache``). 0 to disable.
         """
         super().__init__(self, **kwargs)
         if mode != "r":
@@ -51,6 +58,20 @@ class ZipFileSystem(AbstractFileSystem):
                 )
             fo = files[0]
         self.fo = fo.__enter__()  # the whole instance is a context
+        cache = getattr(self.fo, "cache", None)
+        if (
+            pin_footer
+            and isinstance(cache, BaseCache)
+            and not isinstance(cache, PinnedCache)
+        ):
+            self.fo.cache = PinnedCache(
+                cache.blocksize,
+                cache.fetcher,
+                cache.size,
+                header=0,
+                footer=pin_footer,
+                inner=cache,
+            )
         self.zip = zipfile.ZipFile(self.fo)
         self.block_size = block_size
         self.dir_cache = None
@@ -0,0 +1,354 @@
+from array import array
+from collections import namedtuple
+from collections.abc import MutableMapping
+import datetime
+import math
+import re
+
+
+class DirEntry(MutableMapping):
+    """Compact directory-listing entry
+
+    Behaves like the ``dict`` normally returned by ``ls(detail=True)``, but
+    stores the common fields in ``__slots__`` rather than a per-entry dict,
+    which matters when caching listings of millions of paths. Backend-specific
+    keys which are just other names for a slot (e.g., S3's ``"Key"`` for
+    ``"name"``) are declared in ``_aliases`` and cost nothing to store; any
+    other keys live in a small dict which is only created when needed.
+
+    Subclasses add their own slots for backend fields which are always
+    present, and may override ``_get_extra`` to compute further keys lazily.
+
+    Parameters
+    ----------
+    name: str
+        Full path of the entry, without protocol
+    size: int or None
+        Size in bytes
+    type: str
+        "file", "directory" or other
+    extra: other key/values to expose through the mapping interface
+    """
+
+    __slots__ = ("name", "size", "type", "_extra")
+    _aliases = {}
+
+    def __init__(self, name, size, type, **extra):
+        self.name = name
+        self.size = size
+        self.type = type
+        self._extra = None
+        for k, v in extra.items():
+            self[k] = v
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = _public_slots(cls)
+
+    def _attr(self, key):
+        """Name of the slot holding ``key``, or None"""
+        key = self._aliases.get(key, key)
+        return key if key in self._fields else None
+
+    def _get_extra(self, key):
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def _extra_keys(self):
+        return iter(self._extra or ())
+
+    def __getitem__(self, key):
+        attr = self._attr(key)
+        if attr is None:
+            return self._get_extra(key)
+        try:
+            return getattr(self, attr)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        attr = self._attr(key)
+        if attr is not None:
+            setattr(self, attr, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        attr = self._attr(key)
+        if attr is None:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+        else:
+            try:
+                delattr(self, attr)
+            except AttributeError:
+                raise KeyError(key)
+
+    def __iter__(self):
+        for field in self._fields:
+            if hasattr(self, field):
+                yield field
+        for alias, field in self._aliases.items():
+            if hasattr(self, field):
+                yield alias
+        yield from self._extra_keys()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        """Plain ``dict`` copy of this entry"""
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _public_slots(cls):
+    out = []
+    for klass in reversed(cls.__mro__):
+        for slot in klass.__dict__.get("__slots__", ()):
+            if not slot.startswith("_") and slot not in out:
+                out.append(slot)
+    return tuple(out)
+
+
+DirEntry._fields = _public_slots(DirEntry)
+
+
+def entry_mtime(info):
+    """Modification time of a listing entry as float seconds since the epoch
+
+    Understands the fields used by the different backends: ``mtime`` (local),
+    ``LastModified`` (S3, a datetime) and ``modify`` (FTP MLSD facts, UTC
+    ``YYYYMMDDHHMMSS[.sss]``). Returns NaN if no usable time is present,
+    e.g., for the free-form dates of FTP ``LIST`` output.
+    """
+    for key in ["mtime", "LastModified", "modify"]:
+        try:
+            value = info[key]
+        except KeyError:
+            continue
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            return value.timestamp()
+        if isinstance(value, str):
+            match = _MLSD_TIME.match(value)
+            if match:
+                stamp = datetime.datetime.strptime(
+                    match.group(1), "%Y%m%d%H%M%S"
+                ).replace(tzinfo=datetime.timezone.utc)
+                return stamp.timestamp() + float(match.group(2) or 0)
+    return math.nan
+
+
+_MLSD_TIME = re.compile(r"^(\d{14})(\.\d+)?$")
+
+
+class ColumnarListing(object):
+    """Array-backed listing of many files
+
+    Holds only name, size, modification time and ETag/checksum for each
+    entry, as parallel columns: a list of str for names and ETags, and
+    compact ``array.array`` columns for sizes (``-1`` when unknown) and
+    mtimes (float seconds since the epoch, NaN when unknown). This is
+    much cheaper than a dict of info dicts for inventory-scale listings, and
+    cheap to sort, filter and compare against another listing.
+
+    Produced by ``find(..., columnar=True)`` and ``walk(..., columnar=True)``.
+    """
+
+    def __init__(self, names=None, sizes=None, mtimes=None, etags=None):
+        self.names = list(names or [])
+        self.sizes = array("q", sizes or [])
+        self.mtimes = array("d", mtimes or [])
+        self.etags = list(etags or [])
+        if not (
+            len(self.names) == len(self.sizes) == len(self.mtimes) == len(self.etags)
+        ):
+            raise ValueError("All columns must have the same length")
+
+    @classmethod
+    def from_details(cls, details):
+        """Build from info dicts, or a dict of {name: info} from ``find``"""
+        out = cls()
+        if isinstance(details, dict):
+            details = details.values()
+        for info in details:
+            out.append_info(info)
+        return out
+
+    def append(self, name, size=None, mtime=None, etag=None):
+        self.names.append(name)
+        self.sizes.append(-1 if size is None else size)
+        self.mtimes.append(math.nan if mtime is None else mtime)
+        self.etags.append(etag)
+
+    def append_info(self, info):
+        """Add one entry, given the info dict produced by ``ls``/``info``"""
+        etag = info.get("ETag", info.get("etag"))
+        self.append(info["name"], info.get("size"), entry_mtime(info), etag)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        return self.names[i], self.sizes[i], self.mtimes[i], self.etags[i]
+
+    def __iter__(self):
+        return zip(self.names, self.sizes, self.mtimes, self.etags)
+
+    def __repr__(self):
+        return "<ColumnarListing, %i entries>" % len(self)
+
+    def take(self, indices):
+        """New listing made of the rows at the given positions"""
+        indices = list(indices)
+        return ColumnarListing(
+            [self.names[i] for i in indices],
+            [self.sizes[i] for i in indices],
+            [self.mtimes[i] for i in indices],
+            [self.etags[i] for i in indices],
+        )
+
+    def sorted(self, by="name", reverse=False):
+        """New listing ordered by one of the columns "name", "size", "mtime" """
+        column = {"name": self.names, "size": self.sizes, "mtime": self.mtimes}[by]
+        order = sorted(range(len(self)), key=column.__getitem__, reverse=reverse)
+        return self.take(order)
+
+    def filter(self, min_size=None, max_size=None, newer_than=None, older_than=None):
+        """New listing containing only the rows within the given bounds
+
+        Sizes are in bytes, times in seconds since the epoch; entries with
+        unknown size or time never pass a bound on that column.
+        """
+        keep = []
+        for i, (size, mtime) in enumerate(zip(self.sizes, self.mtimes)):
+            if min_size is not None and not (size >= 0 and size >= min_size):
+                continue
+            if max_size is not None and not (0 <= size <= max_size):
+                continue
+            if newer_than is not None and not mtime > newer_than:
+                continue
+            if older_than is not None and not mtime < older_than:
+                continue
+            keep.append(i)
+        return self.take(keep)
+
+    def to_numpy(self):
+        """Structured numpy array with fields name, size, mtime, etag"""
+        import numpy as np
+
+        dtype = [
+            ("name", object),
+            ("size", "i8"),
+            ("mtime", "f8"),
+            ("etag", object),
+        ]
+        out = np.empty(len(self), dtype=dtype)
+        out["name"] = self.names
+        out["size"] = self.sizes
+        out["mtime"] = self.mtimes
+        out["etag"] = self.etags
+        return out
+
+
+ListingDiff = namedtuple("ListingDiff", ["added", "removed", "changed"])
+
+
+def diff_listings(
+    source,
+    target,
+    source_root="",
+    target_root="",
+    compare=("size",),
+    mtime_tolerance=1.0,
+):
+    """Compare two listings, e.g., of an FTP tree and an S3 prefix
+
+    Entries are matched on their path relative to the given roots, by a
+    sorted merge of the two listings, so the cost is dominated by sorting
+    and no per-entry dicts are created.
+
+    Parameters
+    ----------
+    source, target: ColumnarListing, dict or list
+        Output of ``find(..., columnar=True)``, ``find(..., detail=True)``
+        or a list of info dicts from ``ls``.
+    source_root, target_root: str
+        Prefix to remove from the names of each listing, so that they can be
+        compared, e.g., "/outgoing" and "bucket/incoming".
+    compare: iterable of {"size", "mtime", "etag"}
+        Which columns decide that a file present in both listings has
+        changed. For "mtime", the file counts as changed if the source is
+        newer than the target by more than ``mtime_tolerance`` seconds;
+        "etag" is only compared when both sides have one.
+    mtime_tolerance: float
+        Seconds of clock difference to allow, e.g., because FTP servers
+        report to the second.
+
+    Returns
+    -------
+    ListingDiff of sorted relative names: ``added`` (only in source),
+    ``removed`` (only in target) and ``changed``.
+    """
+    compare = set(compare)
+    unknown = compare - {"size", "mtime", "etag"}
+    if unknown:
+        raise ValueError("Cannot compare on %s" % sorted(unknown))
+    src = _relative(source, source_root)
+    dst = _relative(target, target_root)
+    added, removed, changed = [], [], []
+    i = j = 0
+    while i < len(src) and j < len(dst):
+        sname, dname = src.names[i], dst.names[j]
+        if sname < dname:
+            added.append(sname)
+            i += 1
+        elif sname > dname:
+            removed.append(dname)
+            j += 1
+        else:
+            if _differs(src, i, dst, j, compare, mtime_tolerance):
+                changed.append(sname)
+            i += 1
+            j += 1
+    added.extend(src.names[i:])
+    removed.extend(dst.names[j:])
+    return ListingDiff(added, removed, changed)
+
+
+def _relative(listing, root):
+    if not isinstance(listing, ColumnarListing):
+        listing = ColumnarListing.from_details(listing)
+    root = root.strip("/")
+    names = []
+    for name in listing.names:
+        name = name.strip("/")
+        if root and (name == root or name.startswith(root + "/")):
+            name = name[len(root) :].lstrip("/")
+        names.append(name)
+    out = ColumnarListing(names, listing.sizes, listing.mtimes, listing.etags)
+    if any(a > b for a, b in zip(names, names[1:])):
+        out = out.sorted()
+    return out
+
+
+def _differs(src, i, dst, j, compare, mtime_tolerance):
+    if "size" in compare and src.sizes[i] != dst.sizes[j]:
+        return True
+    if "mtime" in compare and src.mtimes[i] > dst.mtimes[j] + mtime_tolerance:
+        return True
+    if "etag" in compare:
+        setag, detag = src.etags[i], dst.etags[j]
+        if setag is not None and detag is not None and setag != detag:
+            return True
+    return False
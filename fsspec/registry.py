@@ -45,6 +45,7 @@ known_implementations = {
         "err": 'SFTPFileSystem requires "paramiko" to be installed',
     },
     "ftp": {"class": "fsspec.implementations.ftp.FTPFileSystem"},
+    "ftps": {"class": "fsspec.implementations.ftp.FTPSFileSystem"},
     "hdfs": {
         "class": "fsspec.implementations.hdfs.PyArrowHDFS",
         "err": "pyarrow and local java libraries required for HDFS",
@@ -5,6 +5,7 @@ import warnings
 from hashlib import md5
 
 from .dircache import DirCache
+from .listing import ColumnarListing
 from .transaction import Transaction
 from .utils import read_block, tokenize, stringify_path
 
@@ -315,7 +316,7 @@ class AbstractFileSystem(up, metaclass=_Cached):
         except KeyError:
             pass
 
-    def walk(self, path, maxdepth=None, **kwargs):
+    def walk(self, path, maxdepth=None, columnar=False, **kwargs):
         """ Return all files belows path
 
         List all files, recursing into subdirectories; output is iterator-style,
@@ -331,6 +332,10 @@ class AbstractFileSystem(up, metaclass=_Cached):
         maxdepth: int
             Maximum recursion depth. None means limitless, but not recommended
             on link-based file-systems.
+        columnar: bool
+            If True, the files of each directory are given as a
+            ``fsspec.listing.ColumnarListing`` of full paths, sizes, mtimes
+            and ETags, and directories as a list of names.
         kwargs: passed to ``ls``
         """
         path = self._strip_protocol(path)
@@ -359,7 +364,9 @@ class AbstractFileSystem(up, metaclass=_Cached):
             else:
                 files[name] = info
 
-        if detail:
+        if columnar:
+            yield path, list(dirs), ColumnarListing.from_details(files)
+        elif detail:
             yield path, dirs, files
         else:
             yield path, list(dirs), list(files)
@@ -370,9 +377,11 @@ class AbstractFileSystem(up, metaclass=_Cached):
                 return
 
         for d in full_dirs:
-            yield from self.walk(d, maxdepth=maxdepth, detail=detail, **kwargs)
+            yield from self.walk(
+                d, maxdepth=maxdepth, columnar=columnar, detail=detail, **kwargs
+            )
 
-    def find(self, path, maxdepth=None, withdirs=False, **kwargs):
+    def find(self, path, maxdepth=None, withdirs=False, columnar=False, **kwargs):
         """List all files below path.
 
         Like posix ``find`` command without conditions
@@ -385,10 +394,17 @@ class AbstractFileSystem(up, metaclass=_Cached):
         withdirs: bool
             Whether to include directory paths in the output. This is True
             when used by glob, but users usually only want files.
+        columnar: bool
+            If True, return a ``fsspec.listing.ColumnarListing`` sorted by
+            name, holding only the name, size, mtime and ETag of each entry.
+            This is built as the tree is walked, without an intermediate dict
+            of details, so is much lighter for very large trees.
         kwargs are passed to ``ls``.
         """
         # TODO: allow equivalent of -name parameter
         path = self._strip_protocol(path)
+        if columnar:
+            return self._find_columnar(path, maxdepth, withdirs, **kwargs)
         out = dict()
         detail = kwargs.pop("detail", False)
         for path, dirs, files in self.walk(path, maxdepth, detail=True, **kwargs):
@@ -405,6 +421,18 @@ class AbstractFileSystem(up, metaclass=_Cached):
         else:
             return {name: out[name] for name in names}
 
+    def _find_columnar(self, path, maxdepth=None, withdirs=False, **kwargs):
+        kwargs.pop("detail", None)
+        out = ColumnarListing()
+        for _, dirs, files in self.walk(path, maxdepth, detail=True, **kwargs):
+            if withdirs:
+                files.update(dirs)
+            for info in files.values():
+                out.append_info(info)
+        if not len(out) and self.isfile(path):
+            out.append_info(self.info(path))
+        return out.sorted()
+
     def du(self, path, total=True, maxdepth=None, **kwargs):
         """Space used by files within a path
 
@@ -1023,8 +1051,9 @@ class AbstractBufferedFile(io.IOBase):
         autocommit: bool
             Whether to write to final destination; may only impact what
             happens when file is being closed.
-        cache_type: {"readahead", "none", "mmap", "bytes"}, default "readahead"
-            Caching policy in read mode. See the definitions in ``core``.
+        cache_type: {"readahead", "none", "mmap", "bytes", "block", "adaptive"}
+            Caching policy in read mode, default "readahead". See the
+            definitions in ``caching``.
         cache_options : dict
             Additional options passed to the constructor for the cache specified
             by `cache_type`.
@@ -1067,6 +1096,7 @@ class AbstractBufferedFile(io.IOBase):
             self.cache = caches[cache_type](
                 self.blocksize, self._fetch_range, self.size, **cache_options
             )
+            self.cache.fetcher_into = self._fetch_range_into
         else:
             self.buffer = io.BytesIO()
             self.offset = None
@@ -1216,6 +1246,17 @@ class AbstractBufferedFile(io.IOBase):
         """Get the specified set of bytes from remote"""
         raise NotImplementedError
 
+    def _fetch_range_into(self, start, out):
+        """Fill the writable memoryview ``out`` with bytes from ``start``
+
+        Returns the number of bytes written, fewer than ``len(out)`` only at
+        the end of the file. Backends which can receive straight into a
+        buffer override this to avoid allocating and copying each block.
+        """
+        data = self._fetch_range(start, start + len(out))
+        out[: len(data)] = data
+        return len(data)
+
     def read(self, length=-1):
         """
         Return data from cache, or fetch pieces as necessary
@@ -1245,9 +1286,23 @@ class AbstractBufferedFile(io.IOBase):
 
         https://docs.python.org/3/library/io.html#io.RawIOBase.readinto
         """
-        data = self.read(len(b))
-        memoryview(b).cast("B")[: len(data)] = data
-        return len(data)
+        out = memoryview(b).cast("B")
+        if type(self).read is not AbstractBufferedFile.read:
+            # subclass has its own logic for reading
+            data = self.read(len(out))
+            out[: len(data)] = data
+            return len(data)
+        if self.mode != "rb":
+            raise ValueError("File not in read mode")
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        length = min(len(out), max(self.size - self.loc, 0))
+        if length == 0:
+            return 0
+        # the cache copies straight into the caller's buffer
+        nread = self.cache._readinto(self.loc, out[:length])
+        self.loc += nread
+        return nread
 
     def readuntil(self, char=b"\n", blocks=None):
         """Return data between current position and first occurrence of char
@@ -2,7 +2,17 @@ import pickle
 import string
 
 import pytest
-from fsspec.caching import BaseCache, BlockCache, caches
+from fsspec.caching import (
+    AdaptiveCache,
+    BaseCache,
+    BlockBitmap,
+    BlockCache,
+    BlockPool,
+    BytesCache,
+    MMapCache,
+    PinnedCache,
+    caches,
+)
 
 
 def test_cache_getitem(Cache_imp):
@@ -50,6 +60,110 @@ def test_block_cache_lru():
     assert cache.cache_info().currsize == 2
 
 
+def test_block_cache_single_fetch():
+    calls = []
+
+    def fetcher(start, end):
+        calls.append((start, end))
+        return letters_fetcher(start, end)
+
+    cache = BlockCache(4, fetcher, len(string.ascii_letters))
+    assert cache._fetch(2, 10) == string.ascii_letters[2:10].encode()
+    assert calls == [(0, 12)]
+    assert cache.cache_info().misses == 3
+    assert cache._fetch(4, 8) == b"efgh"
+    assert cache._fetch(8, 8) == b""
+    assert len(calls) == 1
+
+
+def test_block_cache_coalesce():
+    calls = []
+
+    def fetcher(start, end):
+        calls.append((start, end))
+        return letters_fetcher(start, end)
+
+    size = len(string.ascii_letters)
+    cache = BlockCache(4, fetcher, size)
+    cache._fetch(8, 12)
+    cache._fetch(20, 24)
+    del calls[:]
+    # only the runs of blocks not yet held are requested
+    assert cache._fetch(1, size) == string.ascii_letters[1:].encode()
+    assert calls == [(0, 8), (12, 20), (24, size)]
+    assert cache.cache_info().hits == 2
+    assert cache.cache_info().currsize == cache.nblocks
+
+
+def test_block_pool_shared():
+    pool = BlockPool(max_bytes=12)
+    c1 = BlockCache(4, letters_fetcher, len(string.ascii_letters), pool=pool)
+    c2 = BlockCache(4, letters_fetcher, len(string.ascii_letters), pool=pool)
+    assert c1[0:8] == b"abcdefgh"
+    assert c2[4:8] == b"efgh"
+    assert pool.nbytes == 12
+    assert c1.cache_info().currsize == 2
+    assert c2.cache_info().currsize == 1
+
+    # least recently used block of either file goes first
+    assert c2[8:12] == b"ijkl"
+    assert pool.nbytes == 12
+    assert c1.cache_info().currsize == 1
+    c1[0:4]
+    assert c1.cache_info().misses == 3
+
+    # blocks of a cache are released when it goes away
+    del c2
+    assert pool.nbytes == 4
+    assert len(pool) == 1
+
+    c3 = pickle.loads(pickle.dumps(c1))
+    assert c3.pool is not pool
+    assert c3[0:4] == b"abcd"
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_mmap_cache_merges_requests(max_workers):
+    calls = []
+
+    def fetcher(start, end):
+        calls.append((start, end))
+        return letters_fetcher(start, end)
+
+    cache = MMapCache(4, fetcher, len(string.ascii_letters), max_workers=max_workers)
+    assert cache[5:7] == b"fg"
+    assert cache[30:33] == string.ascii_letters[30:33].encode()
+    assert calls == [(4, 8), (28, 36)]
+    calls.clear()
+    # blocks 0, 2-6 missing; 1 and 7-8 present: two runs
+    assert cache[0:34] == string.ascii_letters[0:34].encode()
+    assert sorted(calls) == [(0, 4), (8, 28)]
+    calls.clear()
+    assert cache[0:36] == string.ascii_letters[0:36].encode()
+    assert calls == []
+    # end exactly on a block boundary does not fetch the next block
+    assert cache[48:52] == b"WXYZ"
+    assert calls == [(48, 52)]
+
+
+def test_block_bitmap():
+    b = BlockBitmap([1, 3])
+    assert 1 in b and 3 in b and 2 not in b and 1000 not in b
+    b.add_range(5, 30)
+    b.add(3)
+    assert len(b) == 27
+    assert list(b) == [1, 3] + list(range(5, 30))
+    assert b.runs() == [(1, 1), (3, 1), (5, 25)]
+    assert not b.isfull(30)
+    b.update([0, 2, 4])
+    assert b.isfull(30) and not b.isfull(31)
+    assert b == set(range(30))
+    b2 = pickle.loads(pickle.dumps(b))
+    assert b2 == b and len(b2) == 30
+    assert len(pickle.dumps(BlockBitmap(range(20000)))) < 200
+    assert set(BlockBitmap([1]) | BlockBitmap([9])) == {1, 9}
+
+
 def _fetcher(start, end):
     return b"0" * (end - start)
 
@@ -94,3 +208,94 @@ def test_cache_basic(Cache_imp, blocksize, size_requests):
         result = cache[start:end]
         expected = string.ascii_letters[start:end].encode()
         assert result == expected
+
+
+@pytest.mark.parametrize(
+    "size_requests",
+    [[(0, 30), (0, 35), (51, 52)], [(0, 1), (1, 11), (1, 52)], [(40, 52), (11, 15)]],
+)
+@pytest.mark.parametrize("blocksize", [1, 10, 52, 100])
+def test_cache_readinto(Cache_imp, blocksize, size_requests):
+    cache = Cache_imp(blocksize, letters_fetcher, len(string.ascii_letters))
+
+    for start, end in size_requests:
+        buf = bytearray(end - start)
+        n = cache._readinto(start, memoryview(buf))
+        expected = string.ascii_letters[start:end].encode()
+        assert n == len(expected)
+        assert buf[:n] == expected
+
+
+def test_bytes_cache_in_place():
+    size = 1000
+    cache = BytesCache(10, _fetcher, size)
+    cache._fetch(0, 5)
+    buf = cache.cache
+    for i in range(5, size, 5):
+        assert cache._fetch(i, i + 5) == b"0" * 5
+        # extended and trimmed, but never replaced
+        assert cache.cache is buf
+        assert len(buf) < 50
+
+
+def test_adaptive_cache():
+    calls = []
+
+    def fetcher(start, end):
+        calls.append((start, end))
+        return _fetcher(start, end)
+
+    size = 10000
+    cache = AdaptiveCache(10, fetcher, size, max_window=80)
+
+    # random probing: small blocks
+    assert cache._fetch(9995, 10000) == b"0" * 5
+    assert cache._fetch(5003, 5005) == b"0" * 2
+    assert cache.mode == "block"
+    assert calls == [(9990, 10000), (5000, 5010)]
+
+    # sequential: growing read-ahead
+    del calls[:]
+    pos = 0
+    for _ in range(20):
+        assert cache._fetch(pos, pos + 5) == b"0" * 5
+        pos += 5
+    assert cache.mode == "readahead"
+    assert cache.readahead.blocksize == 80
+    assert len(calls) < 10
+
+    # one big read: no caching
+    del calls[:]
+    assert cache._fetch(0, size) == b"0" * size
+    assert cache.mode == "none"
+    assert calls == [(0, size)]
+
+    # the first read of the scan was not yet known to be sequential
+    assert cache.stats["block"] == 3
+    assert cache.stats["readahead"] == 19
+    assert cache.stats["none"] == 1
+    assert cache.stats["fetched_bytes"] > size
+
+
+def test_pinned_cache():
+    calls = []
+
+    def fetcher(start, end):
+        calls.append((start, end))
+        return letters_fetcher(start, end)
+
+    size = len(string.ascii_letters)
+    cache = PinnedCache(4, fetcher, size, header=5, footer=10, cache_type="block")
+    assert cache._fetch(size - 3, size) == b"XYZ"
+    assert cache._fetch(0, 2) == b"ab"
+    assert calls == [(size - 10, size), (0, 5)]
+    # reads through the rest of the file never evict the ends
+    for i in range(5, size - 14, 4):
+        cache._fetch(i, i + 4)
+    del calls[:]
+    assert cache._fetch(size - 10, size) == string.ascii_letters[-10:].encode()
+    assert cache._fetch(0, 5) == b"abcde"
+    assert calls == []
+    assert cache.pinned_hits == 2
+    # spanning all three regions
+    assert cache._fetch(3, size - 2) == string.ascii_letters[3:-2].encode()
@@ -0,0 +1,171 @@
+import pickle
+
+import pytest
+
+import fsspec
+from fsspec.listing import ColumnarListing, DirEntry, diff_listings, entry_mtime
+
+
+class AliasedEntry(DirEntry):
+    __slots__ = ("mtime",)
+    _aliases = {"Key": "name", "Size": "size"}
+
+
+def test_direntry_mapping():
+    e = DirEntry("bucket/file", 10, "file", owner="me")
+    assert e["name"] == "bucket/file"
+    assert e["size"] == 10
+    assert e["type"] == "file"
+    assert e["owner"] == "me"
+    assert dict(e) == {
+        "name": "bucket/file",
+        "size": 10,
+        "type": "file",
+        "owner": "me",
+    }
+    assert e == {"name": "bucket/file", "size": 10, "type": "file", "owner": "me"}
+    assert e.get("missing") is None
+    with pytest.raises(KeyError):
+        e["missing"]
+    assert not hasattr(e, "__dict__")
+
+
+def test_direntry_update():
+    e = DirEntry("a", 0, "file")
+    assert e._extra is None
+    e["size"] = 5
+    e["other"] = 1
+    assert e.size == 5
+    assert e["other"] == 1
+    del e["other"]
+    assert "other" not in e
+    assert len(e) == 3
+
+
+def test_direntry_aliases():
+    e = AliasedEntry("b/k", 3, "file", mtime=1.5)
+    assert e["Key"] == e["name"] == "b/k"
+    assert e["Size"] == 3
+    assert set(e) == {"name", "size", "type", "mtime", "Key", "Size"}
+    e["Key"] = "b/other"
+    assert e.name == "b/other"
+
+    partial = AliasedEntry("b/dir", 0, "directory")
+    assert "mtime" not in partial
+    assert set(partial) == {"name", "size", "type", "Key", "Size"}
+
+
+def test_direntry_pickle():
+    e = AliasedEntry("b/k", 3, "file", mtime=1.5, extra="x")
+    e2 = pickle.loads(pickle.dumps(e))
+    assert isinstance(e2, AliasedEntry)
+    assert e2 == e
+    assert repr(e2) == repr(dict(e))
+
+
+def test_entry_mtime():
+    import datetime
+    import math
+
+    assert entry_mtime({"mtime": 10}) == 10.0
+    dt = datetime.datetime(2020, 1, 1, 12, tzinfo=datetime.timezone.utc)
+    assert entry_mtime({"LastModified": dt}) == dt.timestamp()
+    assert entry_mtime({"modify": "20200101120000"}) == dt.timestamp()
+    assert entry_mtime({"modify": "20200101120000.5"}) == dt.timestamp() + 0.5
+    assert math.isnan(entry_mtime({"modify": "Jan 10 12:00"}))
+    assert math.isnan(entry_mtime({}))
+
+
+def test_columnar_listing():
+    details = {
+        "b": {"name": "b", "size": 20, "type": "file", "mtime": 2.0},
+        "a": {"name": "a", "size": 10, "type": "file", "ETag": '"x"'},
+        "c": {"name": "c", "size": None, "type": "file", "mtime": 3.0},
+    }
+    cl = ColumnarListing.from_details(details)
+    assert len(cl) == 3
+    cl = cl.sorted()
+    assert cl.names == ["a", "b", "c"]
+    assert list(cl.sizes) == [10, 20, -1]
+    assert cl.etags == ['"x"', None, None]
+    assert cl[1] == ("b", 20, 2.0, None)
+    assert cl.sorted(by="size", reverse=True).names == ["b", "a", "c"]
+    assert cl.filter(min_size=15).names == ["b"]
+    assert cl.filter(max_size=15).names == ["a"]
+    assert cl.filter(newer_than=2.5).names == ["c"]
+    assert cl.filter(older_than=2.5).names == ["b"]
+    with pytest.raises(ValueError):
+        ColumnarListing(["a"], [], [], [])
+
+
+def test_find_columnar(tmpdir):
+    fs = fsspec.filesystem("file")
+    root = str(tmpdir)
+    fs.mkdir(root + "/sub")
+    for fn, data in [("/b", b"bb"), ("/a", b"a"), ("/sub/c", b"ccc")]:
+        with open(root + fn, "wb") as f:
+            f.write(data)
+    cl = fs.find(root, columnar=True)
+    assert cl.names == fs.find(root)
+    assert list(cl.sizes) == [1, 2, 3]
+    assert all(m > 0 for m in cl.mtimes)
+
+    cl = fs.find(root + "/a", columnar=True)
+    assert cl.names == [root + "/a"]
+
+    walked = list(fs.walk(root, columnar=True))
+    assert walked[0][1] == ["sub"]
+    assert sorted(walked[0][2].names) == [root + "/a", root + "/b"]
+    assert walked[1][2].names == [root + "/sub/c"]
+
+
+def test_diff_listings():
+    import datetime
+
+    ftp = [
+        {"name": "/out/a", "size": 1, "type": "file", "modify": "20200101120000"},
+        {"name": "/out/b", "size": 2, "type": "file", "modify": "20200101120000"},
+        {"name": "/out/sub/c", "size": 3, "type": "file", "modify": "20200301000000"},
+        {"name": "/out/d", "size": 4, "type": "file", "modify": "20200101120000"},
+    ]
+    utc = datetime.timezone.utc
+    s3 = {
+        "bucket/in/sub/c": {
+            "name": "bucket/in/sub/c",
+            "size": 3,
+            "type": "file",
+            "LastModified": datetime.datetime(2020, 2, 1, tzinfo=utc),
+        },
+        "bucket/in/a": {
+            "name": "bucket/in/a",
+            "size": 1,
+            "type": "file",
+            "LastModified": datetime.datetime(2020, 2, 1, tzinfo=utc),
+        },
+        "bucket/in/b": {
+            "name": "bucket/in/b",
+            "size": 5,
+            "type": "file",
+            "LastModified": datetime.datetime(2020, 2, 1, tzinfo=utc),
+        },
+        "bucket/in/e": {"name": "bucket/in/e", "size": 1, "type": "file"},
+    }
+    diff = diff_listings(ftp, s3, "/out", "bucket/in")
+    assert diff.added == ["d"]
+    assert diff.removed == ["e"]
+    assert diff.changed == ["b"]
+
+    diff = diff_listings(ftp, s3, "/out", "bucket/in", compare=["mtime"])
+    assert diff.changed == ["sub/c"]
+
+    diff = diff_listings(
+        ColumnarListing.from_details(ftp),
+        ColumnarListing.from_details(s3),
+        "out",
+        "bucket/in/",
+        compare=["size", "mtime"],
+    )
+    assert diff.changed == ["b", "sub/c"]
+
+    with pytest.raises(ValueError):
+        diff_listings(ftp, s3, compare=["colour"])
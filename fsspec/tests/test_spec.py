@@ -163,6 +163,33 @@ def test_cache_options():
     assert f.cache.trim is False
 
 
+class IntoFile(AbstractBufferedFile):
+    data = bytes(range(256)) * 4
+
+    def __init__(self, fs, path, **kwargs):
+        self.details = {"name": path, "size": len(self.data), "type": "file"}
+        super().__init__(fs, path, **kwargs)
+
+    def _fetch_range(self, start, end):
+        raise AssertionError("should fetch into buffer")
+
+    def _fetch_range_into(self, start, out):
+        part = self.data[start : start + len(out)]
+        out[: len(part)] = part
+        return len(part)
+
+
+@pytest.mark.parametrize("cache_type", ["none", "mmap"])
+def test_readinto_fetch_into(cache_type):
+    f = IntoFile(DummyTestFS(), "misc/foo.txt", cache_type=cache_type)
+    buf = bytearray(600)
+    assert f.readinto(buf) == 600
+    assert buf == f.data[:600]
+    assert f.readinto(buf) == 424
+    assert buf[:424] == f.data[600:]
+    assert f.readinto(buf) == 0
+
+
 def test_trim_kwarg_warns():
     fs = DummyTestFS()
     with pytest.warns(FutureWarning, match="cache_options"):
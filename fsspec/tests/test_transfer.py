@@ -0,0 +1,110 @@
+import io
+import threading
+import time
+
+import pytest
+
+from fsspec.caching import BlockCache, ReadAheadCache
+from fsspec.transfer import BlockSizeTuner, QueuedWriter
+
+
+def test_queued_writer_roundtrip():
+    out = io.BytesIO()
+    with QueuedWriter(out, max_bytes=100) as q:
+        for i in range(100):
+            q.write(bytes([i]) * 10)
+    assert out.getvalue() == b"".join(bytes([i]) * 10 for i in range(100))
+    assert q.stats["bytes"] == 1000
+    assert q.stats["chunks"] == 100
+    assert q.stats["peak_bytes"] <= 100
+    with pytest.raises(ValueError):
+        q.write(b"more")
+
+
+class SlowWriter(object):
+    def __init__(self):
+        self.data = []
+        self.gate = threading.Event()
+        self.closed = False
+
+    def write(self, data):
+        self.gate.wait()
+        self.data.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+def test_queued_writer_bounded():
+    target = SlowWriter()
+    q = QueuedWriter(target, max_bytes=30, close_target=True)
+    q.write(b"a" * 10)
+    q.write(b"b" * 10)
+    q.write(b"c" * 10)
+    blocked = threading.Thread(target=q.write, args=(b"d" * 10,))
+    blocked.start()
+    time.sleep(0.1)
+    assert blocked.is_alive()
+    target.gate.set()
+    blocked.join(5)
+    assert not blocked.is_alive()
+    q.close()
+    assert b"".join(target.data) == b"a" * 10 + b"b" * 10 + b"c" * 10 + b"d" * 10
+    assert target.closed
+    assert q.stats["producer_stall"] > 0.05
+
+
+def test_queued_writer_error():
+    class Broken(object):
+        def write(self, data):
+            raise OSError("upload failed")
+
+    q = QueuedWriter(Broken(), max_bytes=10)
+    with pytest.raises(OSError):
+        for _ in range(100):
+            q.write(b"x" * 10)
+    with pytest.raises(OSError):
+        q.close()
+
+
+def test_block_size_tuner():
+    t = BlockSizeTuner(1000, minimum=500, maximum=10000, target=1.0)
+    # fast transfers: grow, at most doubling each time
+    assert t.record(1000, 0.01) == 2000
+    assert t.record(2000, 0.01) == 4000
+    # about right
+    assert t.record(4000, 0.9) == int(4000 / 0.9)
+    # slow transfers: shrink, at most halving
+    size = t.size
+    assert t.record(size, 100) == size // 2
+    # small transfers are ignored
+    assert t.record(10, 100) == size // 2
+    # bounds
+    for _ in range(10):
+        t.record(t.size, 100)
+    assert t.size == 500
+    for _ in range(10):
+        t.record(t.size, 0.001)
+    assert t.size == 10000
+
+
+def test_block_size_tuner_apply():
+    class F(object):
+        blocksize = 100
+
+    f = F()
+    f.cache = ReadAheadCache(100, None, 1000)
+    t = BlockSizeTuner(200, 1, 1000)
+    t.apply(f)
+    assert f.blocksize == f.cache.blocksize == 200
+
+    # block-indexed caches must keep matching the file
+    f = F()
+    f.cache = BlockCache(100, None, 1000)
+    t.apply(f)
+    assert f.blocksize == f.cache.blocksize == 100
+
+    # files without a cache, e.g., for writing
+    f = F()
+    t.apply(f)
+    assert f.blocksize == 200
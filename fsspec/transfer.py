@@ -0,0 +1,212 @@
+from collections import deque
+import threading
+import time
+
+from .caching import BaseCache, BytesCache, ReadAheadCache
+
+
+class QueuedWriter(object):
+    """Decouple a producer of bytes from a slow writer with a bounded queue
+
+    ``write()`` only appends to an in-memory queue; a background thread
+    takes chunks off the queue and passes them to ``target.write``. This
+    lets, e.g., the receive loop of ``ftplib.FTP.retrbinary`` keep reading
+    from the socket while an ``S3File`` is uploading a part, instead of the
+    two alternating.
+
+    ``write()`` blocks while more than ``max_bytes`` are waiting, so memory
+    use stays bounded when the target is the slower side. An exception
+    raised by the target is re-raised by the next ``write()`` or by
+    ``close()``.
+
+    Time each side spent blocked on the other is recorded, see ``stats``:
+    a large ``producer_stall`` means the target is the bottleneck, a large
+    ``consumer_stall`` that the source is.
+
+    Parameters
+    ----------
+    target: file-like
+        Anything with a ``write`` method, normally a file opened for writing
+    max_bytes: int
+        Queue depth, in bytes. A single chunk larger than this is still
+        accepted when the queue is empty.
+    close_target: bool
+        Whether ``close()`` also closes ``target``
+
+    Examples
+    --------
+    >>> with s3.open(path, "wb") as f, QueuedWriter(f) as q:  # doctest: +SKIP
+    ...     ftp.retrbinary("RETR " + name, q.write)
+    """
+
+    def __init__(self, target, max_bytes=2 ** 25, close_target=False):
+        self.target = target
+        self.max_bytes = max_bytes
+        self.close_target = close_target
+        self.closed = False
+        self.producer_stall = 0.0
+        self.consumer_stall = 0.0
+        self.nbytes = 0
+        self.nchunks = 0
+        self.peak_bytes = 0
+        self._chunks = deque()
+        self._queued = 0
+        self._done = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        """Queue ``data`` for writing; returns the number of bytes queued"""
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        with self._cond:
+            if self._queued and self._queued + len(data) > self.max_bytes:
+                t0 = time.perf_counter()
+                while (
+                    self._queued
+                    and self._queued + len(data) > self.max_bytes
+                    and self._error is None
+                ):
+                    self._cond.wait()
+                self.producer_stall += time.perf_counter() - t0
+            if self._error is not None:
+                raise self._error
+            self._chunks.append(data)
+            self._queued += len(data)
+            self.peak_bytes = max(self.peak_bytes, self._queued)
+            self._cond.notify_all()
+        return len(data)
+
+    __call__ = write
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._chunks and not self._done:
+                    t0 = time.perf_counter()
+                    while not self._chunks and not self._done:
+                        self._cond.wait()
+                    self.consumer_stall += time.perf_counter() - t0
+                if not self._chunks:
+                    return
+                data = self._chunks.popleft()
+            try:
+                if self._error is None:
+                    self.target.write(data)
+            except BaseException as e:
+                # keep draining, so that the producer never blocks forever
+                self._error = e
+            with self._cond:
+                self._queued -= len(data)
+                if self._error is None:
+                    self.nbytes += len(data)
+                    self.nchunks += 1
+                self._cond.notify_all()
+
+    def flush(self):
+        """Wait until everything queued so far has been written"""
+        with self._cond:
+            while self._queued and self._error is None:
+                self._cond.wait()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Write out the remaining data and stop the background thread"""
+        if self.closed:
+            return
+        self.closed = True
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        if self.close_target:
+            self.target.close()
+
+    @property
+    def stats(self):
+        """Bytes and chunks written, peak queue size, and seconds stalled"""
+        return {
+            "bytes": self.nbytes,
+            "chunks": self.nchunks,
+            "peak_bytes": self.peak_bytes,
+            "producer_stall": self.producer_stall,
+            "consumer_stall": self.consumer_stall,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return "<QueuedWriter to %r>" % (self.target,)
+
+
+class BlockSizeTuner(object):
+    """Pick the size of the next request from how long the last ones took
+
+    Each request costs a round trip of latency plus the time to move its
+    bytes, so small requests waste time on slow-to-answer links, while very
+    large ones hold up the reader and cost more to retry. The tuner aims for
+    requests taking about ``target`` seconds: after each transfer of a full
+    block, the size becomes the observed rate times ``target``, changing by
+    at most a factor of two per step and kept within the given bounds.
+
+    Parameters
+    ----------
+    size: int
+        Initial size, in bytes
+    minimum, maximum: int
+        Bounds on the size; ``minimum`` may be raised later, e.g., to keep
+        the number of parts of an upload within a limit.
+    target: float
+        Desired duration of each request, in seconds
+    """
+
+    def __init__(self, size, minimum, maximum, target=1.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target = target
+        self._size = size
+
+    @property
+    def size(self):
+        return min(max(self._size, self.minimum), self.maximum)
+
+    def record(self, nbytes, seconds):
+        """Account for a transfer of ``nbytes`` which took ``seconds``
+
+        Returns the new size. Transfers much smaller than the current size,
+        such as at the end of a file, say little about the link and are
+        ignored.
+        """
+        size = self.size
+        if seconds > 0 and nbytes >= size // 2:
+            ideal = nbytes / seconds * self.target
+            self._size = int(min(max(ideal, size / 2), size * 2))
+        return self.size
+
+    def apply(self, f):
+        """Set the block size of file ``f``, and of its cache, if that is safe
+
+        Only caches which hold a single contiguous range can change block
+        size while in use. With others, such as "block" or "mmap", which
+        index their blocks by the block size, both are left unchanged, so
+        that they keep matching.
+        """
+        cache = getattr(f, "cache", None)
+        if cache is not None and type(cache) not in (
+            BaseCache,
+            BytesCache,
+            ReadAheadCache,
+        ):
+            return
+        f.blocksize = self.size
+        if cache is not None:
+            cache.blocksize = f.blocksize
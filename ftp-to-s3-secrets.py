@@ -1,5 +1,6 @@
 from ftplib import FTP_TLS
 import s3fs
+from fsspec.transfer import QueuedWriter
 import boto3
 import json
 import logging
@@ -42,5 +43,19 @@ def lambda_handler(event, context):
     logger.info('Login Successful')
     ftps.cwd(ftp_path)
     
-    ftps.retrbinary('RETR ' +file_name , s3.open("{}/{}".format(s3Bucket, file_name), 'wb').write)
+    # only committed once complete, so that a failed transfer leaves no partial file
+    f = s3.open("{}/{}".format(s3Bucket, file_name), 'wb', autocommit=False)
+    try:
+        with QueuedWriter(f) as q:
+            ftps.retrbinary('RETR ' + file_name, q.write)
+        f.close()
+    except BaseException:
+        try:
+            f.close()
+        except Exception:
+            pass
+        f.discard()
+        raise
+    f.commit()
+    logger.info('Transfer stats: ' + str(q.stats))
     logger.info('Download completed: ' +file_name)
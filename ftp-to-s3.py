@@ -1,5 +1,5 @@
-from ftplib import FTP
 import s3fs
+from fsspec.implementations.ftp import FTPFileSystem
 import logging
 
 logger = logging.getLogger()
@@ -13,10 +13,8 @@ def lambda_handler(event, context):
     s3Bucket = "s3-bucket"     #provide s3 bucket name
     file_name = "sample.txt"   #provide file name
 
-    with FTP(ftp_url) as ftp:
-        ftp.login()
-        logger.info('Login Successful')
-        ftp.cwd(ftp_path)
-        logger.info('Downloading file: ' +file_name)
-        ftp.retrbinary('RETR ' + file_name, s3.open("{}/{}".format(s3Bucket, file_name), 'wb').write)
-        logger.info('Download completed ' +file_name)
+    ftp = FTPFileSystem(ftp_url)
+    logger.info('Login Successful')
+    logger.info('Downloading file: ' +file_name)
+    ftp.copy_to(s3, ftp_path + file_name, "{}/{}".format(s3Bucket, file_name))
+    logger.info('Download completed ' +file_name)
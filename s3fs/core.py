@@ -6,7 +6,9 @@ import time
 from typing import Tuple, Optional
 
 from fsspec import AbstractFileSystem
+from fsspec.listing import DirEntry
 from fsspec.spec import AbstractBufferedFile
+from fsspec.transfer import BlockSizeTuner
 
 from fsspec.utils import infer_storage_options
 from fsspec.utils import tokenize
@@ -70,6 +72,17 @@ def _coalesce_version_id(*args):
         return version_ids.pop()
 
 
+class S3Entry(DirEntry):
+    """Compact listing entry for S3, see ``S3FileSystem(compact_listings=)``
+
+    Holds only the fields of the ``list_objects_v2`` response which s3fs
+    uses; ``Key`` and ``Size`` are aliases of ``name`` and ``size`` rather
+    than duplicated values.
+    """
+    __slots__ = ('LastModified', 'ETag', 'StorageClass')
+    _aliases = {'Key': 'name', 'Size': 'size'}
+
+
 class S3FileSystem(AbstractFileSystem):
     """
     Access S3 as if it were a file system.
@@ -117,6 +130,14 @@ class S3FileSystem(AbstractFileSystem):
         user to have the necessary IAM permissions for dealing with versioned
         objects.
     config_kwargs : dict of parameters passed to ``botocore.client.Config``
+    compact_listings : bool (False)
+        If True, directory listings are cached as ``S3Entry`` instances
+        rather than the full boto response dicts, which greatly reduces
+        memory use for prefixes with very many keys.
+    adaptive_block_size : bool (False)
+        If True, files opened with ``open()`` adjust their read size and
+        upload part size to the observed speed of their requests, see
+        ``S3File``.
     kwargs : other parameters for core session
     session : botocore Session object to be used for all connections.
          This session will be used inplace of creating a new session inside S3FileSystem.
@@ -149,7 +170,8 @@ class S3FileSystem(AbstractFileSystem):
                  default_block_size=None, default_fill_cache=True,
                  default_cache_type='bytes', version_aware=False, config_kwargs=None,
                  s3_additional_kwargs=None, session=None, username=None,
-                 password=None, **kwargs):
+                 password=None, compact_listings=False, adaptive_block_size=False,
+                 **kwargs):
         if key and username:
             raise KeyError('Supply either key or username, not both')
         if secret and password:
@@ -180,6 +202,8 @@ class S3FileSystem(AbstractFileSystem):
         self.default_fill_cache = default_fill_cache
         self.default_cache_type = default_cache_type
         self.version_aware = version_aware
+        self.compact_listings = compact_listings
+        self.adaptive_block_size = adaptive_block_size
         self.client_kwargs = client_kwargs
         self.config_kwargs = config_kwargs
         self.req_kw = {'RequestPayer': 'requester'} if requester_pays else {}
@@ -328,7 +352,8 @@ class S3FileSystem(AbstractFileSystem):
                 'token': cred['SessionToken'], 'anon': False}
 
     def _open(self, path, mode='rb', block_size=None, acl='', version_id=None,
-              fill_cache=None, cache_type=None, autocommit=True, requester_pays=None, **kwargs):
+              fill_cache=None, cache_type=None, autocommit=True, requester_pays=None,
+              adaptive_block_size=None, **kwargs):
         """ Open a file for reading or writing
 
         Parameters
@@ -360,6 +385,9 @@ class S3FileSystem(AbstractFileSystem):
         requester_pays : bool (optional)
             If RequesterPays buckets are supported.  If None, defaults to the
             value used when creating the S3FileSystem (which defaults to False.)
+        adaptive_block_size : bool (optional)
+            Whether to tune the block size from observed request times. If
+            None, defaults to the value used when creating the S3FileSystem.
         kwargs: dict-like
             Additional parameters used for s3 methods.  Typically used for
             ServerSideEncryption.
@@ -380,11 +408,14 @@ class S3FileSystem(AbstractFileSystem):
 
         if cache_type is None:
             cache_type = self.default_cache_type
+        if adaptive_block_size is None:
+            adaptive_block_size = self.adaptive_block_size
 
         return S3File(self, path, mode, block_size=block_size, acl=acl,
                       version_id=version_id, fill_cache=fill_cache,
                       s3_additional_kwargs=kw, cache_type=cache_type,
-                      autocommit=autocommit, requester_pays=requester_pays)
+                      autocommit=autocommit, requester_pays=requester_pays,
+                      adaptive_block_size=adaptive_block_size)
 
     def _lsdir(self, path, refresh=False, max_items=None):
         bucket, prefix, _ = self.split_path(path)
@@ -402,18 +433,30 @@ class S3FileSystem(AbstractFileSystem):
                 dircache = []
                 for i in it:
                     dircache.extend(i.get('CommonPrefixes', []))
+                    if self.compact_listings:
+                        files.extend(
+                            S3Entry('/'.join([bucket, c['Key']]), c['Size'],
+                                    'file', LastModified=c['LastModified'],
+                                    ETag=c['ETag'],
+                                    StorageClass=c.get('StorageClass', 'STANDARD'))
+                            for c in i.get('Contents', []))
+                        continue
                     for c in i.get('Contents', []):
                         c['type'] = 'file'
                         c['size'] = c['Size']
+                        c['Key'] = '/'.join([bucket, c['Key']])
+                        c['name'] = c['Key']
                         files.append(c)
-                if dircache:
-                    files.extend([{'Key': l['Prefix'][:-1], 'Size': 0,
-                                  'StorageClass': "DIRECTORY",
-                                   'type': 'directory', 'size': 0}
-                                  for l in dircache])
-                for f in files:
-                    f['Key'] = '/'.join([bucket, f['Key']])
-                    f['name'] = f['Key']
+                for l in dircache:
+                    name = '/'.join([bucket, l['Prefix'][:-1]])
+                    if self.compact_listings:
+                        files.append(S3Entry(name, 0, 'directory',
+                                             StorageClass='DIRECTORY'))
+                    else:
+                        files.append({'Key': name, 'Size': 0,
+                                      'StorageClass': "DIRECTORY",
+                                      'type': 'directory', 'size': 0,
+                                      'name': name})
             except ClientError as e:
                 raise translate_boto_error(e)
 
@@ -1077,6 +1120,12 @@ class S3File(AbstractBufferedFile):
         reading.
     requester_pays : bool (False)
         If RequesterPays buckets are supported.
+    adaptive_block_size : bool (False)
+        If True, the block size changes as the file is used, so that each
+        request takes about a second (see ``fsspec.transfer.BlockSizeTuner``).
+        When writing, the part size stays between ``part_min`` and
+        ``part_max``, and doubles at least every 1000 parts so that the
+        upload never needs more than ``max_parts``.
 
     Examples
     --------
@@ -1092,10 +1141,13 @@ class S3File(AbstractBufferedFile):
     retries = 5
     part_min = 5 * 2 ** 20
     part_max = 5 * 2 ** 30
+    max_parts = 10000
+    read_block_min = 2 ** 16
 
     def __init__(self, s3, path, mode='rb', block_size=5 * 2 ** 20, acl="",
                  version_id=None, fill_cache=True, s3_additional_kwargs=None,
-                 autocommit=True, cache_type='bytes', requester_pays=False):
+                 autocommit=True, cache_type='bytes', requester_pays=False,
+                 adaptive_block_size=False):
         bucket, key, path_version_id = s3.split_path(path)
         if not key:
             raise ValueError('Attempt to open non key-like path: %s' % path)
@@ -1113,10 +1165,16 @@ class S3File(AbstractBufferedFile):
         super().__init__(s3, path, mode, block_size, autocommit=autocommit,
                          cache_type=cache_type)
         self.s3 = self.fs  # compatibility
+        self._tuner = None
         if self.writable():
             if block_size < 5 * 2 ** 20:
                 raise ValueError('Block size must be >=5MB')
+            if adaptive_block_size:
+                self._tuner = BlockSizeTuner(self.blocksize, self.part_min, self.part_max)
         else:
+            if adaptive_block_size:
+                self._tuner = BlockSizeTuner(self.blocksize, self.read_block_min,
+                                             self.part_max)
             if version_id and self.fs.version_aware:
                 self.version_id = version_id
                 self.details = self.fs.info(self.path, version_id=version_id)
@@ -1214,7 +1272,21 @@ class S3File(AbstractBufferedFile):
         return self.fs.url(self.path, **kwargs)
 
     def _fetch_range(self, start, end):
-        return _fetch_range(self.fs.s3, self.bucket, self.key, self.version_id, start, end, req_kw=self.req_kw)
+        t0 = time.perf_counter()
+        out = _fetch_range(self.fs.s3, self.bucket, self.key, self.version_id, start, end, req_kw=self.req_kw)
+        if self._tuner is not None:
+            self._tuner.record(len(out), time.perf_counter() - t0)
+            self._tuner.apply(self)
+        return out
+
+    def _fetch_range_into(self, start, out):
+        t0 = time.perf_counter()
+        n = _fetch_range(self.fs.s3, self.bucket, self.key, self.version_id, start,
+                         start + len(out), req_kw=self.req_kw, out=out)
+        if self._tuner is not None:
+            self._tuner.record(n, time.perf_counter() - t0)
+            self._tuner.apply(self)
+        return n
 
     def _upload_chunk(self, final=False):
         bucket, key, _ = self.fs.split_path(self.path)
@@ -1245,6 +1317,7 @@ class S3File(AbstractBufferedFile):
             part = len(self.parts) + 1
             logger.debug("Upload chunk %s, %s" % (self, part))
 
+            t0 = time.perf_counter()
             for attempt in range(self.retries + 1):
                 try:
                     out = self._call_s3(
@@ -1264,7 +1337,16 @@ class S3File(AbstractBufferedFile):
                 raise IOError('Write failed after %i retries' % self.retries)
 
             self.parts.append({'PartNumber': part, 'ETag': out['ETag']})
-
+            if self._tuner is not None:
+                self._tuner.record(len(data0), time.perf_counter() - t0)
+
+        if self._tuner is not None:
+            # keep within max_parts: 1000 parts of each size from part_min
+            # upwards add up to more than the largest object S3 allows
+            self._tuner.minimum = min(
+                self.part_min * 2 ** (len(self.parts) // (self.max_parts // 10)),
+                self.part_max)
+            self._tuner.apply(self)
         if self.autocommit and final:
             self.commit()
         return not final
@@ -1329,7 +1411,12 @@ class S3File(AbstractBufferedFile):
 
 
 def _fetch_range(client, bucket, key, version_id, start, end, max_attempts=10,
-                 req_kw=None):
+                 req_kw=None, out=None):
+    """Get bytes start-end of the given key
+
+    If ``out``, a writable memoryview, is given, the body is read into it
+    as it arrives and the number of bytes is returned instead.
+    """
     if req_kw is None:
         req_kw = {}
     if start == end:
@@ -1343,7 +1430,7 @@ def _fetch_range(client, bucket, key, version_id, start, end, max_attempts=10,
             'skip fetch for negative range - bucket=%s,key=%s,start=%d,end=%d',
             bucket, key, start, end
         )
-        return b''
+        return b'' if out is None else 0
     logger.debug("Fetch: %s/%s, %s-%s", bucket, key, start, end)
     for i in range(max_attempts):
         try:
@@ -1351,7 +1438,9 @@ def _fetch_range(client, bucket, key, version_id, start, end, max_attempts=10,
                                      Range='bytes=%i-%i' % (start, end - 1),
                                      **version_id_kw(version_id),
                                      **req_kw)
-            return resp['Body'].read()
+            if out is None:
+                return resp['Body'].read()
+            return _read_into(resp['Body'], out)
         except S3_RETRYABLE_ERRORS as e:
             logger.debug('Exception %r on S3 download, retrying', e,
                          exc_info=True)
@@ -1365,7 +1454,7 @@ def _fetch_range(client, bucket, key, version_id, start, end, max_attempts=10,
         except ClientError as e:
             if e.response['Error'].get('Code', 'Unknown') in ['416',
                                                               'InvalidRange']:
-                return b''
+                return b'' if out is None else 0
             raise translate_boto_error(e)
         except Exception as e:
             if 'time' in str(e).lower():  # Actual exception type changes often
@@ -1373,3 +1462,15 @@ def _fetch_range(client, bucket, key, version_id, start, end, max_attempts=10,
             else:
                 raise
     raise RuntimeError("Max number of S3 retries exceeded")
+
+
+def _read_into(body, out, chunk_size=2**20):
+    """Read a streaming body into the memoryview ``out``, chunk by chunk"""
+    n = 0
+    while n < len(out):
+        chunk = body.read(min(len(out) - n, chunk_size))
+        if not chunk:
+            break
+        out[n:n + len(chunk)] = chunk
+        n += len(chunk)
+    return n
@@ -351,6 +351,21 @@ def test_ls(s3):
     assert fn in s3.ls(test_bucket_name + '/test')
 
 
+def test_ls_compact(s3):
+    from s3fs.core import S3Entry
+    s3c = S3FileSystem(anon=False, compact_listings=True)
+    s3.touch(a)
+    L = s3c.ls(test_bucket_name + '/tmp/test', True)
+    assert all(isinstance(f, S3Entry) for f in L)
+    assert [f['Key'] for f in L] == [a]
+    assert L[0]['Size'] == L[0]['size'] == 0
+    assert L[0]['type'] == 'file'
+    assert 'ETag' in L[0]
+    assert s3c.info(test_bucket_name + '/test')['type'] == 'directory'
+    assert s3c.ls(test_bucket_name + '/test', False) == s3.ls(
+        test_bucket_name + '/test', False)
+
+
 def test_pickle(s3):
     import pickle
     s32 = pickle.loads(pickle.dumps(s3))
@@ -913,6 +928,24 @@ def test_write_blocks(s3):
     assert s3.info(test_bucket_name + '/temp')['Size'] == 15 * 2 ** 20
 
 
+def test_adaptive_block_size(s3):
+    mb = 2 ** 20
+    data = b'a' * 18 * mb
+    with s3.open(test_bucket_name + '/temp', 'wb', adaptive_block_size=True) as f, \
+            mock.patch('s3fs.core.S3File.max_parts', new=10):
+        for i in range(0, len(data), 3 * mb):
+            f.write(data[i:i + 3 * mb])
+            # part size at least doubles with every part, for max_parts=10
+            assert f.blocksize >= f.part_min * 2 ** len(f.parts or [])
+    assert s3.cat(test_bucket_name + '/temp') == data
+
+    with s3.open(test_bucket_name + '/temp', 'rb', block_size=2 ** 16,
+                 adaptive_block_size=True) as f:
+        assert f.read(2 ** 16) == data[:2 ** 16]
+        assert f.blocksize > 2 ** 16
+        assert f.read() == data[2 ** 16:]
+
+
 def test_readline(s3):
     all_items = chain.from_iterable([
         files.items(), csv_files.items(), text_files.items()
@@ -1188,6 +1221,24 @@ def test_versions(s3):
         assert fo.read() == b'1'
 
 
+@pytest.mark.skipif(py35, reason='no versions on old moto for py36')
+def test_versions_adaptive_block_size(s3):
+    versioned_file = versioned_bucket_name + '/versioned_file_adaptive'
+    s3 = S3FileSystem(anon=False, version_aware=True)
+    with s3.open(versioned_file, 'wb') as fo:
+        fo.write(b'1')
+    s3.invalidate_cache()
+    first = s3.info(versioned_file)['VersionId']
+    with s3.open(versioned_file, 'wb') as fo:
+        fo.write(b'22')
+
+    with s3.open(versioned_file, version_id=first,
+                 adaptive_block_size=True) as fo:
+        assert fo.version_id == first
+        assert fo.size == 1
+        assert fo.read() == b'1'
+
+
 @pytest.mark.skipif(py35, reason='no versions on old moto for py36')
 def test_list_versions_many(s3):
     # moto doesn't actually behave in the same way that s3 does here so this doesn't test
@@ -1309,6 +1360,20 @@ def test_readinto(s3):
     assert contents.startswith(b'Hello, World!')
 
 
+def test_fetch_range_into(s3):
+    s3.mkdir('bucket')
+
+    with s3.open('bucket/file.txt', 'wb') as fd:
+        fd.write(b'Hello, World!')
+
+    contents = bytearray(20)
+    with s3.open('bucket/file.txt', 'rb', cache_type='none') as fd:
+        assert fd._fetch_range_into(7, memoryview(contents)[:5]) == 5
+        assert contents[:5] == b'World'
+        assert fd.readinto(contents) == 13
+    assert contents.startswith(b'Hello, World!')
+
+
 def test_change_defaults_only_subsequent():
     """Test for Issue #135
 